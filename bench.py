@@ -0,0 +1,385 @@
+"""Headless performance benchmarks with a regression gate.
+
+Every measurement runs in a fresh interpreter against a throwaway model
+directory, so a cold start really is cold and peak RSS belongs to that
+measurement alone:
+
+- cold start: build (train + persist) the model artifacts, then load them again
+- single predictions: p50/p99 of Manual-Input-style calls (compiled forest and sklearn)
+- batch scoring: rows/sec and peak RSS of the Batch Upload path (read + score)
+  at 1k, 100k and 1M rows, for CSV and Excel
+- history: History Tracker chart queries over a year of 1-minute readings
+
+Results are written as JSON. Given a baseline, any metric worse than it by more
+than the threshold fails the run with exit code 1, and so does a baseline metric
+the run did not produce. Excel at 1M rows takes a few minutes on its own; use
+--sizes/--formats for a quick pass (against a baseline made with the same options).
+
+    python bench.py run -o bench.json
+    python bench.py run -o baseline.json --baseline baseline.json --update-baseline
+    python bench.py run -o bench.json --baseline baseline.json --threshold 0.25
+    python bench.py run --sizes 1000,100000 --formats csv --skip history
+    python bench.py compare bench.json baseline.json --threshold-for 'single.*=0.5'
+"""
+import argparse
+import fnmatch
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+SIZES = (1_000, 100_000, 1_000_000)
+FORMATS = ("csv", "excel")
+SUITES = ("cold_start", "single", "batch", "history")
+SINGLE_CALLS = 2_000
+SKLEARN_CALLS = 200
+HISTORY_DAYS = 365
+DEFAULT_THRESHOLD = 0.2
+SEED = 42
+
+
+def _peak_rss_mb():
+    import resource
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (2**20 if sys.platform == "darwin" else 1024), 1)  # bytes on macOS, KiB on Linux
+
+
+def _metric(value, unit, better="lower"):
+    return {"value": value, "unit": unit, "better": better}
+
+
+# ==========================================
+# WORKERS (each runs in its own interpreter)
+# ==========================================
+def bench_cold_start():
+    t0 = time.perf_counter()
+    import engine
+    model = engine.get_trained_model()
+    t1 = time.perf_counter()
+    engine.get_compiled_model()
+    t2 = time.perf_counter()
+    engine.predict_one(40, 30, 50, 0)
+    t3 = time.perf_counter()
+    return {"model_s": t1 - t0, "compiled_s": t2 - t1, "first_prediction_ms": (t3 - t2) * 1e3,
+            "n_trees": len(model.estimators_), "peak_rss_mb": _peak_rss_mb()}
+
+
+def _percentiles(samples):
+    import numpy as np
+
+    p50, p99 = np.percentile(np.asarray(samples) * 1e3, [50, 99])
+    return round(float(p50), 4), round(float(p99), 4)
+
+
+def bench_single(calls=SINGLE_CALLS, sklearn_calls=SKLEARN_CALLS, seed=SEED):
+    # Slider-range inputs, like the Manual Input page
+    import numpy as np
+    import engine
+
+    rng = np.random.default_rng(seed)
+    rows = np.column_stack([rng.integers(0, 101, calls), rng.integers(10, 51, calls),
+                            rng.integers(0, 101, calls), rng.integers(0, 30, calls)])
+    engine.predict_one(40, 30, 50, 0)
+    timings = []
+    for soil, temp, humid, crop in rows.tolist():
+        t0 = time.perf_counter()
+        engine.predict_one(soil, temp, humid, crop)
+        timings.append(time.perf_counter() - t0)
+    p50, p99 = _percentiles(timings)
+
+    # The pre-compiled path: a one-row sklearn predict
+    model = engine.get_trained_model()
+    X = rows[:sklearn_calls].astype(np.float64)
+    model.predict(X[:1])
+    sk_timings = []
+    for i in range(len(X)):
+        t0 = time.perf_counter()
+        model.predict(X[i:i + 1])
+        sk_timings.append(time.perf_counter() - t0)
+    sk_p50, sk_p99 = _percentiles(sk_timings)
+    return {"p50_ms": p50, "p99_ms": p99, "sklearn_p50_ms": sk_p50, "sklearn_p99_ms": sk_p99}
+
+
+def bench_batch(path):
+    # Same calls as a single-file Batch Upload: read_frame, then score_batch with the sklearn model
+    import engine
+    from ingest import read_frame
+
+    model = engine.get_trained_model()
+    t0 = time.perf_counter()
+    df = read_frame(path)
+    t1 = time.perf_counter()
+    engine.score_batch(df, model)
+    t2 = time.perf_counter()
+    return {"rows": len(df), "read_s": t1 - t0, "score_s": t2 - t1,
+            "rows_per_sec": len(df) / max(t2 - t0, 1e-9), "peak_rss_mb": _peak_rss_mb()}
+
+
+def bench_history(days=HISTORY_DAYS, seed=SEED):
+    import numpy as np
+    from history_store import SensorHistoryStore
+
+    n = days * 1440
+    rng = np.random.default_rng(seed)
+    end = 1_700_000_000 // 86400 * 86400
+    ts = end - n * 60 + np.arange(n, dtype=np.int64) * 60
+    with tempfile.TemporaryDirectory() as root:
+        store = SensorHistoryStore(root)
+        t0 = time.perf_counter()
+        store.append("bench", ts, rng.uniform(20, 80, n), rng.uniform(25, 40, n), rng.uniform(40, 90, n),
+                     rng.random(n) < 0.01)
+        t1 = time.perf_counter()
+        out = {"append_s": t1 - t0}
+        for label, span in (("day", 1), ("month", 30), ("year", days)):
+            t0 = time.perf_counter()
+            store.series("bench", end - span * 86400, end)
+            store.irrigation_events("bench", end - span * 86400, end)
+            out[f"{label}_ms"] = (time.perf_counter() - t0) * 1e3
+    return out
+
+
+WORKERS = {"cold_start": bench_cold_start, "single": bench_single, "batch": bench_batch, "history": bench_history}
+
+
+def _run_worker(name, model_dir, **kwargs):
+    here = os.path.dirname(os.path.abspath(__file__))
+    env = dict(os.environ, ECOVERSE_MODEL_DIR=model_dir)
+    out = subprocess.run([sys.executable, os.path.abspath(__file__), "_worker", name, json.dumps(kwargs)],
+                         cwd=here, env=env, capture_output=True, text=True)
+    if out.returncode:
+        raise RuntimeError(f"{name} benchmark failed:\n{out.stderr.strip()}")
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+# ==========================================
+# SAMPLE FILES
+# ==========================================
+def write_sample(path, rows, fmt, seed=SEED, chunk_rows=100_000):
+    # Seeded sensor rows in the upload layout; written in chunks so 1M rows stays small in memory
+    import numpy as np
+    import pandas as pd
+    from knowledge import ALL_CROPS
+
+    rng = np.random.default_rng(seed)
+    crops = np.array(ALL_CROPS)
+
+    def chunks():
+        for start in range(0, rows, chunk_rows):
+            n = min(chunk_rows, rows - start)
+            yield pd.DataFrame({"soil": rng.integers(0, 101, n), "temp": rng.integers(10, 51, n),
+                                "humidity": rng.integers(0, 101, n), "crop": crops[rng.integers(0, len(crops), n)]})
+
+    if fmt == "csv":
+        for i, df in enumerate(chunks()):
+            df.to_csv(path, mode="w" if i == 0 else "a", header=(i == 0), index=False)
+    elif fmt == "excel":
+        from openpyxl import Workbook
+
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet()
+        ws.append(["soil", "temp", "humidity", "crop"])
+        for df in chunks():
+            for row in df.itertuples(index=False):
+                ws.append(list(row))
+        wb.save(path)
+    else:
+        raise ValueError(f"unsupported sample format: {fmt}")
+    return path
+
+
+# ==========================================
+# SUITE
+# ==========================================
+def environment():
+    from importlib import metadata
+
+    import engine
+
+    versions = {}
+    for pkg in ("numpy", "pandas", "scikit-learn", "openpyxl", "pyarrow"):
+        try:
+            versions[pkg] = metadata.version(pkg)
+        except metadata.PackageNotFoundError:
+            versions[pkg] = None
+    return {"python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count(),
+            "model_key": engine.model_key(), "packages": versions, "timestamp": int(time.time())}
+
+
+def run_suite(sizes=SIZES, formats=FORMATS, suites=SUITES, log=None):
+    log = log or (lambda msg: None)
+    metrics = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        model_dir = os.path.join(tmp, "models")
+        if "cold_start" in suites or "single" in suites or "batch" in suites:
+            # First run builds the artifacts, the second loads what it persisted
+            log("cold start: build")
+            build = _run_worker("cold_start", model_dir)
+            log("cold start: load")
+            load = _run_worker("cold_start", model_dir)
+            if "cold_start" in suites:
+                metrics["cold_start.build_s"] = _metric(round(build["model_s"] + build["compiled_s"], 3), "s")
+                metrics["cold_start.load_s"] = _metric(round(load["model_s"] + load["compiled_s"], 3), "s")
+                metrics["cold_start.first_prediction_ms"] = _metric(round(load["first_prediction_ms"], 3), "ms")
+                metrics["cold_start.peak_rss_mb"] = _metric(load["peak_rss_mb"], "MB")
+
+        if "single" in suites:
+            log("single predictions")
+            res = _run_worker("single", model_dir)
+            for key, value in res.items():
+                metrics[f"single.{key}"] = _metric(value, "ms")
+
+        if "batch" in suites:
+            for fmt in formats:
+                for rows in sizes:
+                    path = os.path.join(tmp, f"sample-{rows}." + ("xlsx" if fmt == "excel" else fmt))
+                    log(f"batch {fmt} {rows:,} rows: writing sample")
+                    write_sample(path, rows, fmt)
+                    log(f"batch {fmt} {rows:,} rows: scoring")
+                    res = _run_worker("batch", model_dir, path=path)
+                    os.remove(path)
+                    prefix = f"batch.{fmt}.{rows}"
+                    metrics[f"{prefix}.rows_per_sec"] = _metric(round(res["rows_per_sec"]), "rows/s", "higher")
+                    metrics[f"{prefix}.peak_rss_mb"] = _metric(res["peak_rss_mb"], "MB")
+
+        if "history" in suites:
+            log("history queries")
+            res = _run_worker("history", model_dir)
+            metrics["history.append_s"] = _metric(round(res["append_s"], 3), "s")
+            for label in ("day", "month", "year"):
+                metrics[f"history.{label}_ms"] = _metric(round(res[f"{label}_ms"], 3), "ms")
+    return {"environment": environment(), "metrics": metrics}
+
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD, overrides=None):
+    # Relative change per metric, positive = worse; overrides map fnmatch patterns to thresholds.
+    # A baseline metric the run did not produce (suite skipped or crashed) counts as a regression.
+    rows = []
+    for name, base in baseline["metrics"].items():
+        current = results["metrics"].get(name)
+        if current is None:
+            rows.append({"metric": name, "baseline": base["value"], "current": None, "unit": base["unit"],
+                         "change": None, "threshold": None, "regressed": True, "missing": True})
+            continue
+        if not base["value"]:
+            continue
+        change = current["value"] / base["value"] - 1
+        if base["better"] == "higher":
+            change = -change
+        limit = threshold
+        for pattern, value in (overrides or {}).items():
+            if fnmatch.fnmatchcase(name, pattern):
+                limit = value
+        rows.append({"metric": name, "baseline": base["value"], "current": current["value"],
+                     "unit": base["unit"], "change": round(change, 4), "threshold": limit,
+                     "regressed": change > limit})
+    return rows
+
+
+def _print_comparison(rows):
+    for r in rows:
+        if r.get("missing"):
+            print(f"{r['metric']:<36} {r['baseline']:>12} -> {'-':>12} {r['unit']:<7} MISSING", file=sys.stderr)
+            continue
+        flag = "REGRESSED" if r["regressed"] else "ok"
+        print(f"{r['metric']:<36} {r['baseline']:>12} -> {r['current']:>12} {r['unit']:<7}"
+              f" {r['change']:+7.1%} (limit {r['threshold']:.0%}) {flag}", file=sys.stderr)
+
+
+def _parse_overrides(items):
+    overrides = {}
+    for item in items or ():
+        pattern, _, value = item.rpartition("=")
+        if not pattern:
+            raise SystemExit(f"--threshold-for expects PATTERN=FRACTION, got {item!r}")
+        overrides[pattern] = float(value)
+    return overrides
+
+
+def _load(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ecoverse performance benchmarks")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_run = sub.add_parser("run", help="run the suite and write JSON results")
+    p_run.add_argument("-o", "--output", default="-", help="results JSON (default: stdout)")
+    p_run.add_argument("--sizes", default=",".join(map(str, SIZES)))
+    p_run.add_argument("--formats", default=",".join(FORMATS))
+    p_run.add_argument("--skip", default="", help=f"comma-separated suites to skip ({', '.join(SUITES)})")
+    p_run.add_argument("--baseline", help="fail if any metric regresses against this results file")
+    p_run.add_argument("--update-baseline", action="store_true",
+                       help="write the results to --baseline instead (the only way a baseline is created)")
+
+    p_cmp = sub.add_parser("compare", help="compare two results files")
+    p_cmp.add_argument("results")
+    p_cmp.add_argument("baseline")
+
+    for p in (p_run, p_cmp):
+        p.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                       help="allowed relative regression (0.2 = 20%% worse)")
+        p.add_argument("--threshold-for", action="append", metavar="PATTERN=FRACTION",
+                       help="per-metric threshold, e.g. 'single.*=0.5' (repeatable)")
+
+    p_work = sub.add_parser("_worker")  # internal: one measurement in a fresh interpreter
+    p_work.add_argument("name", choices=list(WORKERS))
+    p_work.add_argument("kwargs")
+
+    args = parser.parse_args(argv)
+    if args.command == "_worker":
+        print(json.dumps(WORKERS[args.name](**json.loads(args.kwargs))))
+        return 0
+    # Checked before the (long) run: a mistyped baseline path must fail the gate, not create a new baseline
+    if args.command == "run" and args.update_baseline and not args.baseline:
+        parser.error("--update-baseline needs --baseline PATH")
+    if args.command == "run" and args.baseline and not args.update_baseline and not os.path.exists(args.baseline):
+        parser.error(f"baseline not found: {args.baseline} (create it with --update-baseline)")
+    if args.command == "compare":
+        for path in (args.results, args.baseline):
+            if not os.path.exists(path):
+                parser.error(f"results file not found: {path}")
+
+    if args.command == "run":
+        skip = {s for s in args.skip.split(",") if s}
+        results = run_suite(sizes=tuple(int(s) for s in args.sizes.split(",") if s),
+                            formats=tuple(f for f in args.formats.split(",") if f),
+                            suites=tuple(s for s in SUITES if s not in skip),
+                            log=lambda msg: print(msg, file=sys.stderr))
+        text = json.dumps(results, indent=2)
+        if args.output == "-":
+            print(text)
+        else:
+            with open(args.output, "w") as f:
+                f.write(text + "\n")
+        if not args.baseline:
+            return 0
+        if args.update_baseline:
+            with open(args.baseline, "w") as f:
+                f.write(text + "\n")
+            print(f"baseline written to {args.baseline}", file=sys.stderr)
+            return 0
+        baseline = _load(args.baseline)
+    else:
+        results, baseline = _load(args.results), _load(args.baseline)
+
+    rows = compare(results, baseline, args.threshold, _parse_overrides(args.threshold_for))
+    _print_comparison(rows)
+    missing = [r["metric"] for r in rows if r.get("missing")]
+    regressed = [r["metric"] for r in rows if r["regressed"] and not r.get("missing")]
+    if missing:
+        print(f"{len(missing)} baseline metric(s) missing from the results: {', '.join(missing)}", file=sys.stderr)
+    if regressed:
+        print(f"{len(regressed)} metric(s) regressed: {', '.join(regressed)}", file=sys.stderr)
+    if missing or regressed:
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
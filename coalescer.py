@@ -0,0 +1,141 @@
+"""Micro-batching scorer shared by all dashboard sessions.
+
+Single-row requests from every session go into one queue. A worker thread
+collects them until `max_batch` rows are waiting or `max_wait_ms` has passed
+since the oldest one arrived, scores them with one vectorized predict, and
+resolves each caller's Future. Queue depth, batch sizes and latency
+percentiles are available from `stats()` for tuning.
+
+    python coalescer.py --clients 200 --requests 20    # load test
+"""
+import os
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+import numpy as np
+
+import engine
+
+MAX_BATCH = int(os.environ.get("ECOVERSE_BATCH_MAX", "64"))
+MAX_WAIT_MS = float(os.environ.get("ECOVERSE_BATCH_WAIT_MS", "5"))
+
+_STOP = object()
+
+
+class MicroBatcher:
+    def __init__(self, predict_fn=engine.predict_rows, max_batch=MAX_BATCH, max_wait_ms=MAX_WAIT_MS, history=10_000):
+        self.predict_fn = predict_fn
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue = queue.Queue()
+        self._latencies = deque(maxlen=history)   # seconds, enqueue -> result
+        self._batch_sizes = deque(maxlen=history)
+        self._requests = 0
+        self._batches = 0
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, soil, temp, humid, crop_id):
+        fut = Future()
+        self._queue.put((time.perf_counter(), (soil, temp, humid, crop_id), fut))
+        return fut
+
+    def predict(self, soil, temp, humid, crop_id, timeout=5.0):
+        return self.submit(soil, temp, humid, crop_id).result(timeout)
+
+    def close(self):
+        self._queue.put(_STOP)
+        self._thread.join()
+
+    def _collect(self, first):
+        # Wait for more rows until the batch is full or the oldest row has waited max_wait
+        batch = [first]
+        deadline = first[0] + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP:
+                self._queue.put(_STOP)
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is _STOP:
+                break
+            batch = self._collect(first)
+            X = np.array([row for _, row, _ in batch], dtype=np.float64)
+            try:
+                preds = self.predict_fn(X)
+            except Exception as e:
+                for _, _, fut in batch:
+                    fut.set_exception(e)
+                continue
+            done = time.perf_counter()
+            for (enqueued, _, fut), pred in zip(batch, preds):
+                fut.set_result(int(pred))
+            with self._lock:
+                self._latencies.extend(done - enqueued for enqueued, _, _ in batch)
+                self._batch_sizes.append(len(batch))
+                self._requests += len(batch)
+                self._batches += 1
+
+    def stats(self):
+        with self._lock:
+            lat = np.array(self._latencies) * 1000.0
+            sizes = np.array(self._batch_sizes)
+            requests, batches = self._requests, self._batches
+        p50, p90, p99 = np.percentile(lat, [50, 90, 99]) if len(lat) else (0.0, 0.0, 0.0)
+        return {
+            "queue_depth": self._queue.qsize(),
+            "requests": requests,
+            "batches": batches,
+            "mean_batch": round(float(sizes.mean()), 2) if len(sizes) else 0.0,
+            "p50_ms": round(float(p50), 3),
+            "p90_ms": round(float(p90), 3),
+            "p99_ms": round(float(p99), 3),
+            "max_batch": self.max_batch,
+            "max_wait_ms": self.max_wait * 1000.0,
+        }
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Load-test the micro-batching scorer")
+    parser.add_argument("--clients", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=20, help="requests per client")
+    parser.add_argument("--max-batch", type=int, default=MAX_BATCH)
+    parser.add_argument("--max-wait-ms", type=float, default=MAX_WAIT_MS)
+    args = parser.parse_args()
+
+    engine.predict_one(40, 30, 50, 0)  # load the model outside the measurement
+    batcher = MicroBatcher(max_batch=args.max_batch, max_wait_ms=args.max_wait_ms)
+    rng = np.random.default_rng(0)
+
+    def client(seed):
+        r = np.random.default_rng(seed)
+        for _ in range(args.requests):
+            batcher.predict(int(r.integers(0, 101)), int(r.integers(10, 51)), int(r.integers(0, 101)), int(r.integers(0, 30)))
+
+    threads = [threading.Thread(target=client, args=(int(s),)) for s in rng.integers(0, 2**31, args.clients)]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - t0
+    out = batcher.stats()
+    out["throughput_rps"] = round(out["requests"] / elapsed)
+    print(json.dumps(out, indent=2))
+    batcher.close()
@@ -0,0 +1,424 @@
+"""Headless scoring engine: model training/loading, prediction and batch scoring.
+
+Nothing heavy is imported at module level. numpy, pandas, sklearn and joblib are
+imported inside the functions that need them, so `import engine` is cheap and a
+single prediction from an already compiled forest never touches sklearn.
+
+Command line:
+    python engine.py score sensors.csv -o scored.csv
+    cat sensors.parquet | python engine.py score - --format parquet > scored.csv
+    python engine.py startup
+"""
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
+from functools import lru_cache
+from importlib import metadata
+
+import metrics
+from knowledge import ALL_CROPS, STATE_CROP_MAP, SORTED_STATES, SEASONS, CROP_MAP
+from translations import TRANSLATIONS, CROP_IDS, STATE_NAMES, get_txt
+
+# ==========================================
+# MODEL ARTIFACTS
+# ==========================================
+# Everything that changes the trained forest goes into this config; its hash is the artifact key
+TRAIN_CONFIG = {
+    'seed': 42, 'n': 5000, 'crops': ALL_CROPS,
+    'high_water': [1, 5, 13, 14, 17, 20], 'low_water': [6, 7, 9, 19],
+    'soil_limits': {'high': 60, 'low': 25, 'other': 40},
+    'heat': {'temp': 35, 'soil': 50},
+    'params': {'n_estimators': 100, 'random_state': 42},
+}
+USE_DECISION_GRID = os.environ.get("ECOVERSE_DECISION_GRID", "0") == "1"
+MODEL_DIR = os.environ.get("ECOVERSE_MODEL_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "models"))
+
+def model_key(config=TRAIN_CONFIG):
+    # sklearn version is part of the key: pickled trees are not portable across releases.
+    # Read from package metadata so computing the key does not import sklearn.
+    blob = json.dumps({'config': config, 'sklearn': metadata.version("scikit-learn")}, sort_keys=True).encode()
+    return hashlib.sha256(blob).hexdigest()[:16]
+
+def artifact_path(kind, config=TRAIN_CONFIG, model_dir=MODEL_DIR):
+    name = {'forest': "forest-{}.joblib", 'compiled': "forest-{}.compiled", 'grid': "grid-{}.npy"}[kind]
+    return os.path.join(model_dir, name.format(model_key(config)))
+
+FEATURES = ['soil', 'temp', 'humid', 'crop']
+
+def synthetic_training_data(config=TRAIN_CONFIG):
+    import numpy as np
+    import pandas as pd
+
+    np.random.seed(config['seed'])
+    n = config['n']
+    df = pd.DataFrame({
+        'soil': np.random.uniform(10, 90, n),
+        'temp': np.random.uniform(15, 45, n),
+        'humid': np.random.uniform(20, 90, n),
+        'crop': np.random.randint(0, len(config['crops']), n)
+    })
+
+    high_water = config['high_water']
+    low_water = config['low_water']
+    limits, heat = config['soil_limits'], config['heat']
+
+    conds = [
+        (df['crop'].isin(high_water)) & (df['soil'] < limits['high']),
+        (df['crop'].isin(low_water)) & (df['soil'] < limits['low']),
+        (~df['crop'].isin(high_water + low_water)) & (df['soil'] < limits['other']),
+        (df['temp'] > heat['temp']) & (df['soil'] < heat['soil'])
+    ]
+    df['needed'] = np.select(conds, [1, 1, 1, 1], default=0)
+    return df[FEATURES], df['needed']
+
+def train_model(config=TRAIN_CONFIG):
+    from sklearn.ensemble import RandomForestClassifier
+
+    X, y = synthetic_training_data(config)
+    model = RandomForestClassifier(**config['params'])
+    model.fit(X, y)
+    return model
+
+def load_or_train_model(config=TRAIN_CONFIG, model_dir=MODEL_DIR):
+    import joblib
+
+    path = artifact_path('forest', config, model_dir)
+    if os.path.exists(path):
+        # Saves the retrain, not memory: sklearn copies the tree arrays into each process's own heap,
+        # so memory-mapping this file would share nothing. The compiled forest is the shared copy.
+        return joblib.load(path)
+    model = train_model(config)
+    os.makedirs(model_dir, exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    joblib.dump(model, tmp)  # uncompressed: loads without a decompression pass
+    os.replace(tmp, path)
+    return model
+
+def load_or_compile_model(model=None, config=TRAIN_CONFIG, model_dir=MODEL_DIR):
+    from forest import CompiledForest, compile_forest
+
+    path = artifact_path('compiled', config, model_dir)
+    if os.path.isdir(path):
+        return CompiledForest.load(path)
+    compiled = compile_forest(model if model is not None else load_or_train_model(config, model_dir))
+    os.makedirs(model_dir, exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    compiled.save(tmp)
+    try:
+        os.replace(tmp, path)
+    except OSError:  # another process published it first
+        shutil.rmtree(tmp, ignore_errors=True)
+    return compiled
+
+# ==========================================
+# MODEL VERSIONS (see feedback.py)
+# ==========================================
+# Feedback updates publish versions under models/versions/<id>/ and point CURRENT at one.
+# Without a CURRENT pointer the base artifacts above are served.
+VERSIONS_DIR = os.path.join(MODEL_DIR, "versions")
+CURRENT_PATH = os.path.join(VERSIONS_DIR, "CURRENT")
+_UNSET = object()
+_active = (_UNSET, None)  # (CURRENT file signature, resolved version)
+
+def version_dir(version):
+    return os.path.join(VERSIONS_DIR, version)
+
+def _pointer_signature():
+    try:
+        st = os.stat(CURRENT_PATH)
+    except FileNotFoundError:
+        return None
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+def _resolve_pointer():
+    try:
+        with open(CURRENT_PATH) as f:
+            version = f.read().strip() or None
+        if version:
+            with open(os.path.join(version_dir(version), "meta.json")) as f:
+                # Versions grown from a different base config are stale after a retrain
+                if json.load(f).get("base_key") != model_key():
+                    version = None
+    except FileNotFoundError:
+        version = None
+    return version
+
+def active_version():
+    # One stat per call; the pointer is re-read whenever CURRENT is replaced, so a rollback or
+    # update from the CLI or another replica takes effect here on the next request
+    global _active
+    sig = _pointer_signature()
+    cached_sig, version = _active
+    if sig != cached_sig:
+        version = _resolve_pointer()
+        _active = (sig, version)
+    return version
+
+def activate(version):
+    # Publish the pointer for other processes, then swap this process over with one assignment
+    global _active
+    os.makedirs(VERSIONS_DIR, exist_ok=True)
+    tmp = os.path.join(VERSIONS_DIR, f"CURRENT.{os.getpid()}.tmp")
+    with open(tmp, "w") as f:
+        f.write(version or "")
+    os.replace(tmp, CURRENT_PATH)
+    _active = (_pointer_signature(), version)
+
+# Loaded versions kept per process: the base, the active one and the one being warmed to replace it.
+# Every feedback update publishes a version, so older ones must be let go.
+VERSION_CACHE_SIZE = 3
+
+@lru_cache(maxsize=VERSION_CACHE_SIZE)
+def model_for_version(version):
+    with metrics.stage("model_load"):
+        if version is None:
+            return load_or_train_model()
+        import joblib
+        return joblib.load(os.path.join(version_dir(version), "forest.joblib"))
+
+@lru_cache(maxsize=VERSION_CACHE_SIZE)
+def compiled_for_version(version):
+    # Loading an existing compiled artifact needs only numpy
+    if version is None:
+        path = artifact_path('compiled')
+        model = None if os.path.isdir(path) else model_for_version(None)
+        with metrics.stage("model_load"):
+            return load_or_compile_model(model)
+    from forest import CompiledForest
+    with metrics.stage("model_load"):
+        return CompiledForest.load(os.path.join(version_dir(version), "compiled"))
+
+def get_trained_model():
+    return model_for_version(active_version())
+
+def get_compiled_model():
+    # Flat-array copy of the forest for single-row predictions (skips sklearn's per-call overhead);
+    # its arrays stay memory-mapped, so replicas on one host share them
+    return compiled_for_version(active_version())
+
+def warm_version(version):
+    # Load a version's artifacts before activating it, so no request waits on the load
+    model_for_version(version)
+    compiled_for_version(version)
+
+@lru_cache(maxsize=None)
+def _is_base_version(version):
+    # Versions never change once published, so one read per version
+    try:
+        with open(os.path.join(version_dir(version), "meta.json")) as f:
+            meta = json.load(f)
+    except FileNotFoundError:
+        return False
+    return meta.get("method") == "base" and meta.get("base_key") == model_key()
+
+def grid_for_version(version):
+    # The grid is built from the base forest: serve it for no version and for the published base
+    # version (feedback.py ensure_base), which is the same forest, e.g. after a rollback to it
+    if not USE_DECISION_GRID or not (version is None or _is_base_version(version)):
+        return None
+    return get_decision_grid()
+
+@lru_cache(maxsize=None)
+def get_decision_grid():
+    # Optional ~1.5 MB bitset of every slider combination, persisted next to the model
+    from grid import DecisionGrid, load_or_build_grid
+
+    path = artifact_path('grid')
+    if os.path.exists(path):
+        return DecisionGrid.load(path, len(ALL_CROPS))
+    return load_or_build_grid(model_for_version(None), len(ALL_CROPS), path)
+
+# ==========================================
+# PREDICTION
+# ==========================================
+def predict_one(soil, temp, humid, crop_id):
+    version = active_version()
+    grid = grid_for_version(version)
+    compiled = compiled_for_version(version)
+    with metrics.stage("prediction"):
+        pred = grid.lookup(soil, temp, humid, crop_id) if grid else None
+        if pred is None:
+            pred = compiled.predict_one(soil, temp, humid, crop_id)
+    return int(pred)
+
+def predict_rows(X):
+    # Same routing as predict_one for an (n, 4) array of [soil, temp, humid, crop_id] rows
+    version = active_version()
+    compiled = compiled_for_version(version)
+    grid = grid_for_version(version)
+    with metrics.stage("prediction"):
+        return grid.predict(X, fallback=compiled) if grid else compiled.predict(X)
+
+# Batch defaults (used when a column is missing from the uploaded file)
+BATCH_DEFAULTS = {'soil': 40, 'temp': 30, 'humidity': 50, 'crop': 'Wheat'}
+BATCH_CHUNK_ROWS = 50_000
+
+def batch_features(df):
+    import numpy as np
+    from ingest import resolve_columns
+
+    # Resolve columns once (case insensitive, last duplicate wins like the old row dicts)
+    cols = resolve_columns(df.columns)
+    n = len(df)
+    feats = np.empty((n, 4), dtype=np.float64)
+    for j, key in enumerate(['soil', 'temp', 'humidity']):
+        feats[:, j] = df[cols[key]].to_numpy(dtype=np.float64) if key in cols else BATCH_DEFAULTS[key]
+
+    # Vectorized crop lookup: unknown names -> -1 -> Wheat (0)
+    if 'crop' in cols:
+        feats[:, 3] = np.maximum(crop_codes(df[cols['crop']]), 0)
+    else:
+        feats[:, 3] = CROP_MAP.get(BATCH_DEFAULTS['crop'], 0)
+    return feats
+
+@lru_cache(maxsize=None)
+def _crop_lookup():
+    # Every display name in every language -> crop ID, built once from the compiled catalog
+    import numpy as np
+    import pandas as pd
+
+    return pd.Index(list(CROP_IDS)), np.append(np.fromiter(CROP_IDS.values(), dtype=np.int64), -1)
+
+def crop_codes(values):
+    # Crop names (English or any UI language) -> crop ID, -1 if unknown; categoricals are mapped once per category
+    import numpy as np
+    import pandas as pd
+
+    names, ids = _crop_lookup()
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        lookup = np.append(ids[names.get_indexer(values.cat.categories)], -1)
+        return lookup[values.cat.codes.to_numpy()]  # code -1 (missing) hits the trailing -1
+    return ids[names.get_indexer(values)]  # index -1 (not found) hits the trailing -1
+
+@lru_cache(maxsize=None)
+def _state_lookup():
+    # Display name in any language -> index into SORTED_STATES; unknown -> len(SORTED_STATES)
+    import numpy as np
+    import pandas as pd
+
+    index = {name: i for i, name in enumerate(SORTED_STATES)}
+    ids = np.fromiter((index[en] for en in STATE_NAMES.values()), dtype=np.int64, count=len(STATE_NAMES))
+    return pd.Index(list(STATE_NAMES)), np.append(ids, len(SORTED_STATES))
+
+def state_codes(values):
+    # Optional 'state' column of a batch file, for the per-state prediction counters
+    import numpy as np
+    import pandas as pd
+
+    names, ids = _state_lookup()
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        lookup = np.append(ids[names.get_indexer(values.cat.categories)], len(SORTED_STATES))
+        return lookup[values.cat.codes.to_numpy()]
+    return ids[names.get_indexer(values)]
+
+METRIC_STATES = SORTED_STATES + ["unknown"]
+
+def iter_batch_predictions(df, model, chunk_size=BATCH_CHUNK_ROWS):
+    # One predict call per chunk instead of one per row
+    from ingest import resolve_columns
+
+    with metrics.stage("feature_mapping"):
+        feats = batch_features(df)
+        cols = resolve_columns(df.columns)
+        states = state_codes(df[cols['state']]) if 'state' in cols else None
+    for start in range(0, len(feats), chunk_size):
+        stop = start + chunk_size
+        with metrics.stage("prediction"):
+            preds = model.predict(feats[start:stop])
+        metrics.count_predictions(feats[start:stop, 3], preds, ALL_CROPS,
+                                  None if states is None else states[start:stop],
+                                  METRIC_STATES if states is not None else ("unknown",))
+        yield start, preds
+
+def score_batch(df, model=None, chunk_size=BATCH_CHUNK_ROWS):
+    import numpy as np
+
+    model = model if model is not None else get_trained_model()
+    preds = np.zeros(len(df), dtype=np.int64)
+    for start, chunk in iter_batch_predictions(df, model, chunk_size):
+        preds[start:start + len(chunk)] = chunk
+    return preds
+
+def status_labels(preds, lang="English"):
+    import numpy as np
+
+    labels = np.array([get_txt(lang, "alert_safe"), get_txt(lang, "alert_irrigate")], dtype=object)
+    return labels[preds]
+
+# ==========================================
+# COMMAND LINE
+# ==========================================
+def iter_input_frames(path, fmt=None, chunk_size=BATCH_CHUNK_ROWS, keep=None):
+    # Only the feature columns (pinned dtypes) plus the pass-through ones, bounded chunks (see ingest.py)
+    from ingest import KEEP_COLUMNS, iter_frames
+
+    source = sys.stdin.buffer if path == '-' else path
+    yield from iter_frames(source, fmt, chunk_size, name=None if path != '-' else 'stdin.csv',
+                           keep=KEEP_COLUMNS if keep is None else keep)
+
+def score_files(paths, output, fmt=None, lang="English", chunk_size=BATCH_CHUNK_ROWS, keep=None):
+    rows = 0
+    model = get_trained_model()
+    for path in paths:
+        for df in iter_input_frames(path, fmt, chunk_size, keep):
+            preds = score_batch(df, model, chunk_size)
+            df['needs_irrigation'] = preds
+            df['AI Status'] = status_labels(preds, lang)
+            df.to_csv(output, header=(rows == 0), index=False)
+            rows += len(df)
+    return rows
+
+def measure_startup():
+    # Fresh interpreter, so nothing is already imported or cached
+    import subprocess
+
+    code = (
+        "import json, sys, time\n"
+        "t0 = time.perf_counter()\n"
+        "import engine\n"
+        "t1 = time.perf_counter()\n"
+        "heavy = sorted(m for m in ('sklearn', 'pandas') if m in sys.modules)\n"
+        "engine.predict_one(40, 30, 50, 0)\n"
+        "t2 = time.perf_counter()\n"
+        "print(json.dumps({'import_ms': round((t1 - t0) * 1e3, 2), "
+        "'first_prediction_ms': round((t2 - t1) * 1e3, 2), 'heavy_modules_on_import': heavy}))\n"
+    )
+    here = os.path.dirname(os.path.abspath(__file__))
+    out = subprocess.run([sys.executable, "-c", code], cwd=here, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="engine.py", description="Ecoverse headless irrigation scoring")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_score = sub.add_parser("score", help="score CSV/Excel/Parquet/Arrow files ('-' reads stdin)")
+    p_score.add_argument("inputs", nargs="+")
+    p_score.add_argument("-o", "--output", default="-", help="output CSV (default: stdout)")
+    p_score.add_argument("--format", choices=["csv", "excel", "parquet", "arrow"], help="input format (default: from extension)")
+    p_score.add_argument("--lang", default="English", choices=list(TRANSLATIONS.keys()))
+    p_score.add_argument("--chunk-size", type=int, default=BATCH_CHUNK_ROWS)
+    p_score.add_argument("--keep-columns", help="columns copied to the output besides the features "
+                                                "(default: field,timestamp; '*' = all)")
+
+    sub.add_parser("startup", help="measure import time and first-prediction latency")
+
+    args = parser.parse_args(argv)
+    if args.command == "score":
+        from ingest import parse_keep
+
+        keep = None if args.keep_columns is None else parse_keep(args.keep_columns)
+        if args.output == "-":
+            rows = score_files(args.inputs, sys.stdout, args.format, args.lang, args.chunk_size, keep)
+        else:
+            with open(args.output, "w", newline="", encoding="utf-8") as out:
+                rows = score_files(args.inputs, out, args.format, args.lang, args.chunk_size, keep)
+        print(f"scored {rows} rows", file=sys.stderr)
+    elif args.command == "startup":
+        print(json.dumps(measure_startup(), indent=2))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,304 @@
+"""Farmer feedback ingestion and incremental model updates.
+
+Feedback rows ("irrigated and it was needed", "pump ON but soil was fine") are
+appended to a CSV log. An update grows the current forest with a few
+warm-started trees fitted on the synthetic training data plus the feedback
+(weighted up), or, once the forest reaches `max_trees`, replaces its oldest trees.
+Updates run on a background thread; the new model is compiled, written as a
+new version under models/versions/ and only then activated, so serving never
+waits on training. Every version keeps its metadata for comparison and rollback.
+
+    python feedback.py add 32 38 40 Rice needed
+    python feedback.py update
+    python feedback.py versions
+    python feedback.py rollback v0001
+"""
+import copy
+import csv
+import json
+import os
+import re
+import sys
+import threading
+import time
+
+import engine
+from knowledge import CROP_MAP
+
+FEEDBACK_PATH = os.path.join(engine.MODEL_DIR, "feedback.csv")
+FEEDBACK_FIELDS = ["ts", "soil", "temp", "humid", "crop", "needed", "predicted"]
+
+
+# ==========================================
+# FEEDBACK LOG
+# ==========================================
+class FeedbackLog:
+    def __init__(self, path=FEEDBACK_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def append(self, soil, temp, humid, crop_id, needed, predicted=None):
+        # needed: what the field actually required (1 = irrigation was needed)
+        row = [int(time.time()), soil, temp, humid, int(crop_id), int(bool(needed)),
+               "" if predicted is None else int(predicted)]
+        with self._lock:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            new = not os.path.exists(self.path)
+            with open(self.path, "a", newline="") as f:
+                w = csv.writer(f)
+                if new:
+                    w.writerow(FEEDBACK_FIELDS)
+                w.writerow(row)
+
+    def load(self):
+        import pandas as pd
+
+        if not os.path.exists(self.path):
+            return pd.DataFrame(columns=FEEDBACK_FIELDS)
+        return pd.read_csv(self.path)
+
+    def __len__(self):
+        if not os.path.exists(self.path):
+            return 0
+        with open(self.path) as f:
+            return max(sum(1 for _ in f) - 1, 0)
+
+
+# ==========================================
+# VERSION REGISTRY
+# ==========================================
+class ModelRegistry:
+    def __init__(self, root=engine.VERSIONS_DIR):
+        self.root = root
+
+    def versions(self):
+        if not os.path.isdir(self.root):
+            return []
+        out = []
+        for name in sorted(os.listdir(self.root)):
+            meta = os.path.join(self.root, name, "meta.json")
+            if os.path.exists(meta):
+                with open(meta) as f:
+                    out.append(json.load(f))
+        return out
+
+    def _next_id(self):
+        # Every vNNNN directory counts, including ones another publisher has claimed but not finished
+        ids = [int(name[1:]) for name in os.listdir(self.root) if re.fullmatch(r"v\d{4,}", name)]
+        return f"v{max(ids, default=-1) + 1:04d}"
+
+    def _claim(self):
+        # mkdir is atomic: when two updaters (threads or replicas) pick the same id, one gets the next
+        os.makedirs(self.root, exist_ok=True)
+        while True:
+            version = self._next_id()
+            try:
+                os.mkdir(os.path.join(self.root, version))
+                return version
+            except FileExistsError:
+                continue
+
+    def publish(self, model, meta):
+        # The version directory is claimed first; meta.json is renamed into place last, so a version
+        # only appears in versions() once it is complete
+        import joblib
+        from forest import compile_forest
+
+        version = self._claim()
+        final = os.path.join(self.root, version)
+        joblib.dump(model, os.path.join(final, "forest.joblib"))
+        compile_forest(model).save(os.path.join(final, "compiled"))
+        meta = dict(meta, version=version, created=int(time.time()), n_trees=len(model.estimators_))
+        tmp = os.path.join(final, f"meta.json.{os.getpid()}.tmp")
+        with open(tmp, "w") as f:
+            json.dump(meta, f, indent=2)
+        os.replace(tmp, os.path.join(final, "meta.json"))
+        return version
+
+    def ensure_base(self):
+        # The served base model is published as a version, so there is always something to roll back to.
+        # After a config or sklearn change the old base is stale: a new one is published for the current key.
+        key = engine.model_key()
+        for meta in self.versions():
+            if meta["method"] == "base" and meta.get("base_key") == key:
+                return meta["version"]
+        return self.publish(engine.model_for_version(None), {"parent": None, "method": "base", "n_feedback": 0,
+                                                             "base_key": key})
+
+    def activate(self, version):
+        if version not in {v["version"] for v in self.versions()}:
+            raise ValueError(f"unknown model version: {version}")
+        engine.warm_version(version)
+        engine.activate(version)
+
+    def rollback(self):
+        # Back to the parent of the active version
+        current = engine.active_version()
+        meta = {v["version"]: v for v in self.versions()}
+        parent = meta.get(current, {}).get("parent")
+        if parent is None:
+            raise ValueError("no earlier version to roll back to")
+        self.activate(parent)
+        return parent
+
+    def compare(self, versions=None, log=None):
+        # Agreement with the feedback labels, and with the base model on the synthetic data
+        import numpy as np
+
+        fb = (log if log is not None else FeedbackLog()).load()
+        X_syn, _ = engine.synthetic_training_data()
+        X_syn = X_syn.to_numpy(dtype=np.float64)
+        base = engine.compiled_for_version(None).predict(X_syn)
+        rows = []
+        for meta in self.versions():
+            if versions and meta["version"] not in versions:
+                continue
+            compiled = engine.compiled_for_version(meta["version"])
+            row = {"version": meta["version"], "method": meta["method"], "n_trees": meta["n_trees"],
+                   "agree_with_base": float(np.mean(compiled.predict(X_syn) == base))}
+            if len(fb):
+                X_fb = fb[["soil", "temp", "humid", "crop"]].to_numpy(dtype=np.float64)
+                row["feedback_accuracy"] = float(np.mean(compiled.predict(X_fb) == fb["needed"].to_numpy()))
+            rows.append(row)
+        return rows
+
+
+# ==========================================
+# INCREMENTAL UPDATES
+# ==========================================
+def training_frame(log, feedback_weight):
+    import numpy as np
+    import pandas as pd
+
+    X, y = engine.synthetic_training_data()
+    w = np.ones(len(X))
+    fb = log.load()
+    if len(fb):
+        X = pd.concat([X, fb[["soil", "temp", "humid", "crop"]].astype(X.dtypes.to_dict())], ignore_index=True)
+        y = pd.concat([y, fb["needed"].astype(y.dtype)], ignore_index=True)
+        w = np.r_[w, np.full(len(fb), feedback_weight)]
+    return X, y, w, len(fb)
+
+
+def update_model(model, X, y, sample_weight, trees=10, max_trees=150):
+    # Warm-start extra trees; past max_trees, drop as many of the oldest trees as were added
+    new = copy.deepcopy(model)
+    new.set_params(warm_start=True, n_estimators=len(new.estimators_) + trees)
+    new.fit(X, y, sample_weight=sample_weight)
+    method = "grow"
+    if len(new.estimators_) > max_trees:
+        drop = len(new.estimators_) - max_trees
+        new.estimators_ = new.estimators_[drop:]
+        method = "refresh"
+    new.set_params(warm_start=False, n_estimators=len(new.estimators_))
+    return new, method
+
+
+class FeedbackUpdater:
+    def __init__(self, log=None, registry=None, trees=10, max_trees=150, feedback_weight=5.0, update_every=50):
+        self.log = log if log is not None else FeedbackLog()
+        self.registry = registry if registry is not None else ModelRegistry()
+        self.trees = trees
+        self.max_trees = max_trees
+        self.feedback_weight = feedback_weight
+        self.update_every = update_every
+        self._pending = 0
+        self._pending_lock = threading.Lock()  # submit() runs on every Streamlit session's thread
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._update_lock = threading.Lock()
+        self.last_error = None
+
+    def submit(self, soil, temp, humid, crop_id, needed, predicted=None):
+        self.log.append(soil, temp, humid, crop_id, needed, predicted)
+        with self._pending_lock:
+            self._pending += 1
+            due = self._pending >= self.update_every
+        if due:
+            self.request_update()
+
+    def request_update(self):
+        self._wake.set()
+
+    def run_update(self):
+        # Synchronous update; the background thread calls this
+        with self._update_lock:
+            with self._pending_lock:
+                self._pending = 0
+            base = self.registry.ensure_base()
+            # active_version() re-reads CURRENT, so an operator's rollback is the parent, and it is
+            # None for versions grown from a stale base
+            parent = engine.active_version() or base
+            X, y, w, n_feedback = training_frame(self.log, self.feedback_weight)
+            model, method = update_model(engine.model_for_version(parent), X, y, w, self.trees, self.max_trees)
+            version = self.registry.publish(model, {"parent": parent, "method": method, "n_feedback": n_feedback,
+                                                    "base_key": engine.model_key()})
+            self.registry.activate(version)
+            return version
+
+    def _loop(self):
+        while not self._stop.is_set():
+            self._wake.wait()
+            self._wake.clear()
+            if self._stop.is_set():
+                break
+            try:
+                self.run_update()
+                self.last_error = None
+            except Exception as e:  # keep serving the current model
+                self.last_error = f"{type(e).__name__}: {e}"
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name="feedback-updater", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join()
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Feedback log and model versions")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_add = sub.add_parser("add", help="record one feedback reading")
+    p_add.add_argument("soil", type=float)
+    p_add.add_argument("temp", type=float)
+    p_add.add_argument("humid", type=float)
+    p_add.add_argument("crop", choices=list(CROP_MAP))
+    p_add.add_argument("outcome", choices=["needed", "not_needed"])
+    p_up = sub.add_parser("update", help="fit extra trees on the feedback and activate the result")
+    p_up.add_argument("--trees", type=int, default=10)
+    p_up.add_argument("--max-trees", type=int, default=150)
+    sub.add_parser("versions", help="list versions with feedback accuracy")
+    p_rb = sub.add_parser("rollback", help="activate a version (default: parent of the active one)")
+    p_rb.add_argument("version", nargs="?")
+    args = parser.parse_args(argv)
+
+    if args.command == "add":
+        FeedbackLog().append(args.soil, args.temp, args.humid, CROP_MAP[args.crop], args.outcome == "needed")
+    elif args.command == "update":
+        print(FeedbackUpdater(trees=args.trees, max_trees=args.max_trees).run_update())
+    elif args.command == "versions":
+        active = engine.active_version()
+        for row in ModelRegistry().compare():
+            print(("* " if row["version"] == active else "  ") + json.dumps(row))
+    elif args.command == "rollback":
+        registry = ModelRegistry()
+        if args.version:
+            registry.activate(args.version)
+            print(args.version)
+        else:
+            print(registry.rollback())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,156 @@
+"""Flat, array-backed copy of a fitted RandomForestClassifier.
+
+All trees are packed into one set of contiguous node arrays, so a prediction is a
+handful of NumPy gathers instead of 100 sklearn tree calls plus input validation.
+Predictions are bit-identical to ``model.predict``.
+"""
+import os
+import pickle
+
+import numpy as np
+
+ARRAYS = ("feature", "threshold", "children", "is_leaf", "nan_left", "value", "roots", "classes")
+
+
+def _round_down_f32(thr):
+    # Largest float32 <= thr, so `x <= t32` matches sklearn's `float32(x) <= float64 thr` exactly
+    t32 = thr.astype(np.float32)
+    over = t32.astype(np.float64) > thr
+    t32[over] = np.nextafter(t32[over], np.float32(-np.inf))
+    return t32
+
+
+class CompiledForest:
+    def __init__(self, feature, threshold, children, is_leaf, nan_left, value, roots, classes, depth):
+        self.feature = feature        # int32, split feature per node (0 for leaves)
+        self.threshold = threshold    # float32, split threshold (+inf for leaves)
+        self.children = children      # int32, global [left, right] node index pairs, interleaved
+        self.is_leaf = is_leaf        # bool
+        self.nan_left = nan_left      # bool, where NaN inputs go
+        self.value = value            # float64 (n_nodes, n_classes), per-tree class probabilities at leaves
+        self.roots = roots            # int32, root node of each tree
+        self.classes = classes
+        self.depth = int(depth)
+
+    @classmethod
+    def from_sklearn(cls, model):
+        feats, thrs, kids, leaves, nans, vals, roots = [], [], [], [], [], [], []
+        offset, depth = 0, 0
+        for est in model.estimators_:
+            t = est.tree_
+            n = t.node_count
+            leaf = t.children_left == -1
+            idx = np.arange(n, dtype=np.int64) + offset
+
+            feats.append(np.where(leaf, 0, t.feature).astype(np.int32))
+            thr = _round_down_f32(t.threshold.astype(np.float64))
+            thr[leaf] = np.inf
+            thrs.append(thr)
+            pair = np.empty(2 * n, dtype=np.int32)
+            pair[0::2] = np.where(leaf, idx, t.children_left + offset)
+            pair[1::2] = np.where(leaf, idx, t.children_right + offset)
+            kids.append(pair)
+            leaves.append(leaf)
+            missing = getattr(t, "missing_go_to_left", None)
+            nans.append(np.zeros(n, dtype=bool) if missing is None else np.asarray(missing, dtype=bool))
+
+            # Same normalisation as DecisionTreeClassifier.predict_proba
+            proba = t.value[:, 0, :].astype(np.float64)
+            norm = proba.sum(axis=1)
+            norm[norm == 0.0] = 1.0
+            vals.append(proba / norm[:, None])
+
+            roots.append(offset)
+            offset += n
+            depth = max(depth, t.max_depth)
+
+        return cls(
+            np.concatenate(feats), np.concatenate(thrs), np.concatenate(kids), np.concatenate(leaves),
+            np.concatenate(nans), np.ascontiguousarray(np.concatenate(vals)),
+            np.asarray(roots, dtype=np.int32), np.asarray(model.classes_), depth,
+        )
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    def apply(self, X):
+        # Walk every (row, tree) pair in lock-step, dropping pairs as they reach a leaf
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X[None, :]
+        flat = X.ravel()
+        has_nan = bool(np.isnan(flat).any())
+
+        node = np.tile(self.roots, len(X))
+        out = node.copy()
+        active = np.flatnonzero(~self.is_leaf.take(node))
+        node = node[active]
+        base = (active // self.n_trees).astype(np.int32) * X.shape[1]
+        while len(active):
+            x = flat.take(base + self.feature.take(node))
+            go_right = ~(x <= self.threshold.take(node))
+            if has_nan:
+                go_right &= ~(np.isnan(x) & self.nan_left.take(node))
+            node = self.children.take(2 * node + go_right)
+            done = self.is_leaf.take(node)
+            if done.any():
+                out[active[done]] = node[done]
+                keep = ~done
+                active, node, base = active[keep], node[keep], base[keep]
+        return out.reshape(len(X), self.n_trees)
+
+    def predict_proba(self, X, chunk_size=20_000):
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X[None, :]
+        out = np.empty((len(X), self.value.shape[1]), dtype=np.float64)
+        for start in range(0, len(X), chunk_size):
+            leaves = self.apply(X[start:start + chunk_size])
+            # Trees are summed in order, like RandomForestClassifier, so ties break identically
+            acc = np.zeros((len(leaves), self.value.shape[1]), dtype=np.float64)
+            for t in range(self.n_trees):
+                acc += self.value[leaves[:, t]]
+            out[start:start + len(leaves)] = acc / self.n_trees
+        return out
+
+    def predict(self, X, chunk_size=20_000):
+        return self.classes[np.argmax(self.predict_proba(X, chunk_size), axis=1)]
+
+    def predict_one(self, soil, temp, humid, crop_id):
+        return self.predict([[soil, temp, humid, crop_id]])[0]
+
+    @property
+    def nbytes(self):
+        return sum(getattr(self, name).nbytes for name in ARRAYS)
+
+    def save(self, path):
+        # One .npy per array so every one of them can be memory-mapped on load
+        os.makedirs(path, exist_ok=True)
+        for name in ARRAYS:
+            np.save(os.path.join(path, f"{name}.npy"), getattr(self, name))
+        with open(os.path.join(path, "depth.txt"), "w") as f:
+            f.write(str(self.depth))
+
+    @classmethod
+    def load(cls, path, mmap_mode="r"):
+        arrays = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mmap_mode) for name in ARRAYS}
+        with open(os.path.join(path, "depth.txt")) as f:
+            depth = int(f.read())
+        return cls(depth=depth, **arrays)
+
+
+def compile_forest(model):
+    return CompiledForest.from_sklearn(model)
+
+
+def footprint(model, compiled):
+    pickled = len(pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL))
+    return {
+        "pickled_bytes": pickled,
+        "compiled_bytes": compiled.nbytes,
+        "ratio": round(compiled.nbytes / pickled, 3),
+        "nodes": len(compiled.feature),
+        "trees": compiled.n_trees,
+        "max_depth": compiled.depth,
+    }
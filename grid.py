@@ -0,0 +1,90 @@
+"""Precomputed decision table for the integer slider input space.
+
+Manual Input only produces integer soil (0-100), temp (10-50) and humidity (0-100)
+plus one of the crop IDs, so every possible answer fits in a ~1.5 MB bitset.
+In-grid lookups are a single array read; anything else falls back to the model.
+"""
+import os
+
+import numpy as np
+
+SOIL_RANGE = (0, 100)
+TEMP_RANGE = (10, 50)
+HUMID_RANGE = (0, 100)
+
+
+class DecisionGrid:
+    def __init__(self, bits, n_crops):
+        self.bits = bits          # uint8, little-endian packed "irrigation needed" flags
+        self.n_crops = int(n_crops)
+        self.lo = np.array([SOIL_RANGE[0], TEMP_RANGE[0], HUMID_RANGE[0], 0])
+        self.hi = np.array([SOIL_RANGE[1], TEMP_RANGE[1], HUMID_RANGE[1], self.n_crops - 1])
+        self.shape = tuple(int(n) for n in self.hi - self.lo + 1)   # (soil, temp, humid, crop)
+        if len(self.bits) * 8 < np.prod(self.shape):
+            raise ValueError("decision grid does not cover the input space")
+
+    @classmethod
+    def from_model(cls, model, n_crops):
+        classes = model.classes if hasattr(model, "classes") else model.classes_
+        if list(classes) != [0, 1]:
+            raise ValueError("decision grid needs a binary 0/1 model")
+        soil = np.arange(SOIL_RANGE[0], SOIL_RANGE[1] + 1)
+        temp = np.arange(TEMP_RANGE[0], TEMP_RANGE[1] + 1)
+        humid = np.arange(HUMID_RANGE[0], HUMID_RANGE[1] + 1)
+        s, t, h = (a.ravel() for a in np.meshgrid(soil, temp, humid, indexing="ij"))
+        block = np.column_stack([s, t, h, np.zeros_like(s)]).astype(np.float64)
+
+        # One crop at a time (~420k rows) keeps the build memory bounded
+        flags = np.empty((n_crops, len(block)), dtype=bool)
+        for crop_id in range(n_crops):
+            block[:, 3] = crop_id
+            flags[crop_id] = model.predict(block) == 1
+        return cls(np.packbits(flags.ravel(), bitorder="little"), n_crops)
+
+    def _index(self, ints):
+        # Flat index laid out as [crop][soil][temp][humid]
+        soil, temp, humid, crop = (ints - self.lo).T
+        n_soil, n_temp, n_humid, _ = self.shape
+        return ((crop * n_soil + soil) * n_temp + temp) * n_humid + humid
+
+    def _bit(self, idx):
+        return (self.bits[idx >> 3] >> (idx & 7)) & 1
+
+    def in_grid(self, X):
+        X = np.asarray(X, dtype=np.float64)
+        return np.all((X == np.floor(X)) & (X >= self.lo) & (X <= self.hi), axis=1)
+
+    def lookup(self, soil, temp, humid, crop_id):
+        # None when the point is off-grid, so callers can fall back to the model
+        row = np.array([[soil, temp, humid, crop_id]], dtype=np.float64)
+        if not self.in_grid(row)[0]:
+            return None
+        return int(self._bit(self._index(row.astype(np.int64))[0]))
+
+    def predict(self, X, fallback):
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X[None, :]
+        out = np.empty(len(X), dtype=np.int64)
+        hit = self.in_grid(X)
+        out[hit] = self._bit(self._index(X[hit].astype(np.int64)))
+        if not hit.all():
+            out[~hit] = fallback.predict(X[~hit])
+        return out
+
+    def save(self, path):
+        np.save(path, self.bits)
+
+    @classmethod
+    def load(cls, path, n_crops, mmap_mode="r"):
+        return cls(np.load(path, mmap_mode=mmap_mode), n_crops)
+
+
+def load_or_build_grid(model, n_crops, path):
+    if os.path.exists(path):
+        return DecisionGrid.load(path, n_crops)
+    grid = DecisionGrid.from_model(model, n_crops)
+    tmp = f"{path}.{os.getpid()}.tmp.npy"
+    grid.save(tmp)
+    os.replace(tmp, path)
+    return grid
@@ -0,0 +1,280 @@
+"""Append-only columnar store for per-field sensor readings.
+
+Each field is a directory of fixed-width column files (timestamps, soil, temp,
+humidity, irrigation flag) that are memory-mapped for reads, so a range query is
+two binary searches on the time index plus array slices. Hourly and daily
+min/mean/max rollups are maintained on append, letting a year of 1-minute
+readings be charted from a few thousand points. Irrigation events are kept in
+their own index so the log never scans the raw readings.
+
+Single writer per field; any number of readers. ts.bin is written last and acts
+as the commit record: readers only see rows whose whole timestamp is on disk, and
+the writer truncates anything past it (left by a crash mid-append) before
+appending. Rollups are written after the commit, so rollups.rows records how
+many raw rows they cover; when that falls behind, the next append rebuilds the
+rollup tail from the raw rows.
+"""
+import os
+import time
+from urllib.parse import quote, unquote
+
+import numpy as np
+
+COLUMNS = {"ts": np.int64, "soil": np.float32, "temp": np.float32, "humid": np.float32, "irrigated": np.uint8}
+METRICS = ("soil", "temp", "humid")
+ROLLUPS = {"hour": 3600, "day": 86400}
+ROLLUP_DTYPE = np.dtype(
+    [("ts", np.int64), ("n", np.int64)]
+    + [(f"{m}_{stat}", np.float64 if stat == "sum" else np.float32) for m in METRICS for stat in ("min", "max", "sum")]
+)
+
+
+def _read(path, dtype):
+    # Whole records only: a torn write can leave a partial one at the end
+    dtype = np.dtype(dtype)
+    n = os.path.getsize(path) // dtype.itemsize if os.path.exists(path) else 0
+    if n == 0:
+        return np.empty(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r", shape=(n,))
+
+
+def _truncate(path, size):
+    if os.path.exists(path) and os.path.getsize(path) > size:
+        os.truncate(path, size)
+
+
+def _append(path, arr):
+    with open(path, "ab") as f:
+        f.write(np.ascontiguousarray(arr).tobytes())
+
+
+def _bucketize(ts, cols, width):
+    # Per-bucket count/min/max/sum for sorted timestamps
+    keys = ts // width * width
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    out = np.zeros(len(starts), dtype=ROLLUP_DTYPE)
+    out["ts"] = keys[starts]
+    out["n"] = np.diff(np.r_[starts, len(ts)])
+    for m in METRICS:
+        v = cols[m]
+        out[f"{m}_min"] = np.minimum.reduceat(v, starts)
+        out[f"{m}_max"] = np.maximum.reduceat(v, starts)
+        out[f"{m}_sum"] = np.add.reduceat(v.astype(np.float64), starts)
+    return out
+
+
+def _merge_bucket(a, b):
+    merged = a.copy()
+    merged["n"] = a["n"] + b["n"]
+    for m in METRICS:
+        merged[f"{m}_min"] = min(a[f"{m}_min"], b[f"{m}_min"])
+        merged[f"{m}_max"] = max(a[f"{m}_max"], b[f"{m}_max"])
+        merged[f"{m}_sum"] = a[f"{m}_sum"] + b[f"{m}_sum"]
+    return merged
+
+
+class SensorHistoryStore:
+    def __init__(self, root):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def _dir(self, field):
+        return os.path.join(self.root, quote(field, safe=""))
+
+    def _path(self, field, name):
+        return os.path.join(self._dir(field), name)
+
+    def fields(self):
+        return sorted(unquote(d) for d in os.listdir(self.root) if os.path.isdir(os.path.join(self.root, d)))
+
+    def __len__(self):
+        return sum(self.count(f) for f in self.fields())
+
+    def count(self, field):
+        path = self._path(field, "ts.bin")
+        return os.path.getsize(path) // 8 if os.path.exists(path) else 0
+
+    def _rollup_rows(self, field):
+        # Raw rows covered by the rollups; stores written before the watermark existed use the bucket counts
+        try:
+            with open(self._path(field, "rollups.rows")) as f:
+                return int(f.read())
+        except (FileNotFoundError, ValueError):
+            return min(int(_read(self._path(field, f"rollup_{level}.bin"), ROLLUP_DTYPE)["n"].sum())
+                       for level in ROLLUPS)
+
+    def _set_rollup_rows(self, field, rows):
+        path = self._path(field, "rollups.rows")
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            f.write(str(rows))
+        os.replace(tmp, path)
+
+    # ---------- writes ----------
+    def append(self, field, ts, soil, temp, humid, irrigated=None):
+        ts = np.asarray(ts, dtype=np.int64)
+        if len(ts) == 0:
+            return 0
+        cols = {
+            "soil": np.asarray(soil, dtype=np.float32),
+            "temp": np.asarray(temp, dtype=np.float32),
+            "humid": np.asarray(humid, dtype=np.float32),
+            "irrigated": np.zeros(len(ts), np.uint8) if irrigated is None else np.asarray(irrigated, dtype=np.uint8),
+        }
+        if np.any(ts[1:] < ts[:-1]):
+            raise ValueError("timestamps must be sorted")
+        os.makedirs(self._dir(field), exist_ok=True)
+        existing = _read(self._path(field, "ts.bin"), np.int64)
+        if len(existing) and ts[0] < existing[-1]:
+            raise ValueError("store is append-only: readings older than the last stored timestamp")
+
+        first_row = len(existing)
+        del existing
+        self._truncate_uncommitted(field, first_row)
+        self._repair_rollups(field, first_row)
+        # Value columns and events first, ts.bin last: a reader never sees a timestamp without its values
+        for name, arr in cols.items():
+            _append(self._path(field, f"{name}.bin"), arr.astype(COLUMNS[name], copy=False))
+        events = np.flatnonzero(cols["irrigated"]).astype(np.int64) + first_row
+        if len(events):
+            _append(self._path(field, "events.bin"), events)
+        _append(self._path(field, "ts.bin"), ts)
+
+        for level, width in ROLLUPS.items():
+            self._update_rollup(field, level, _bucketize(ts, cols, width))
+        self._set_rollup_rows(field, first_row + len(ts))
+        return len(ts)
+
+    def _truncate_uncommitted(self, field, rows):
+        # Drop a torn timestamp, and values and events written past the last committed one, left by an
+        # interrupted append
+        for name, dtype in COLUMNS.items():
+            _truncate(self._path(field, f"{name}.bin"), rows * np.dtype(dtype).itemsize)
+        path = self._path(field, "events.bin")
+        events = _read(path, np.int64)
+        keep = int(np.searchsorted(events, rows, side="left"))
+        del events
+        _truncate(path, keep * 8)
+
+    def _repair_rollups(self, field, rows):
+        # An append interrupted after its commit left the rollups short of the raw rows (or holding a partial
+        # bucket): drop every bucket from the first uncovered row's bucket on and rebuild them from raw rows
+        covered = self._rollup_rows(field)
+        if covered == rows:
+            return
+        ts = _read(self._path(field, "ts.bin"), np.int64)
+        for level, width in ROLLUPS.items():
+            path = self._path(field, f"rollup_{level}.bin")
+            stored = _read(path, ROLLUP_DTYPE)
+            key = ts[min(covered, rows - 1)] // width * width if rows else 0
+            keep = int(np.searchsorted(stored["ts"], key, side="left"))
+            del stored
+            _truncate(path, keep * ROLLUP_DTYPE.itemsize)
+            lo = int(np.searchsorted(ts, key, side="left"))
+            if lo < rows:
+                cols = {m: _read(self._path(field, f"{m}.bin"), COLUMNS[m])[lo:rows] for m in METRICS}
+                _append(path, _bucketize(np.asarray(ts[lo:rows]), cols, width))
+        del ts
+        self._set_rollup_rows(field, rows)
+
+    def _update_rollup(self, field, level, buckets):
+        path = self._path(field, f"rollup_{level}.bin")
+        stored = _read(path, ROLLUP_DTYPE)
+        if len(stored) and stored[-1]["ts"] == buckets[0]["ts"]:
+            # First new bucket continues the last stored one: rewrite that record in place
+            merged = _merge_bucket(stored[-1], buckets[0])
+            with open(path, "r+b") as f:
+                f.seek((len(stored) - 1) * ROLLUP_DTYPE.itemsize)
+                f.write(np.array([merged], dtype=ROLLUP_DTYPE).tobytes())
+            buckets = buckets[1:]
+        del stored
+        if len(buckets):
+            _append(path, buckets)
+
+    # ---------- reads ----------
+    def _bounds(self, ts, start, end):
+        lo = 0 if start is None else int(np.searchsorted(ts, start, side="left"))
+        hi = len(ts) if end is None else int(np.searchsorted(ts, end, side="left"))
+        return lo, hi
+
+    def _committed(self, field, columns=COLUMNS):
+        # Every requested column cut to the same length, never past ts.bin (the commit record)
+        arrays = {name: _read(self._path(field, f"{name}.bin"), COLUMNS[name]) for name in set(columns) | {"ts"}}
+        n = min(len(a) for a in arrays.values())
+        return {name: a[:n] for name, a in arrays.items()}
+
+    def range(self, field, start=None, end=None, columns=COLUMNS):
+        # Readings with start <= ts < end, as memory-mapped slices
+        arrays = self._committed(field, columns)
+        lo, hi = self._bounds(arrays["ts"], start, end)
+        return {name: arrays[name][lo:hi] for name in columns}
+
+    def rollup(self, field, level="hour", start=None, end=None):
+        # Bucketed min/mean/max; buckets are selected by their start time
+        stored = _read(self._path(field, f"rollup_{level}.bin"), ROLLUP_DTYPE)
+        lo, hi = self._bounds(stored["ts"], start, end)
+        rows = stored[lo:hi]
+        out = {"ts": np.asarray(rows["ts"]), "n": np.asarray(rows["n"])}
+        for m in METRICS:
+            out[f"{m}_min"] = np.asarray(rows[f"{m}_min"])
+            out[f"{m}_mean"] = (rows[f"{m}_sum"] / np.maximum(rows["n"], 1)).astype(np.float32)
+            out[f"{m}_max"] = np.asarray(rows[f"{m}_max"])
+        return out
+
+    def irrigation_events(self, field, start=None, end=None):
+        # Row numbers come from the event index, timestamps/values are gathered for just those rows
+        arrays = self._committed(field, ("ts", "soil"))
+        events = _read(self._path(field, "events.bin"), np.int64)
+        events = events[:int(np.searchsorted(events, len(arrays["ts"]), side="left"))]  # committed rows only
+        if len(events) == 0:
+            return {"ts": np.empty(0, np.int64), "soil": np.empty(0, np.float32)}
+        event_ts = arrays["ts"][events]
+        lo, hi = self._bounds(event_ts, start, end)
+        rows = np.asarray(events[lo:hi])
+        return {"ts": np.asarray(event_ts[lo:hi]), "soil": arrays["soil"][rows]}
+
+    def series(self, field, start=None, end=None, max_points=2000):
+        # Raw readings when they fit the budget, else the means of the finest rollup that does
+        lo, hi = self._bounds(self._committed(field, ("ts",) + METRICS)["ts"], start, end)
+        if hi - lo <= max_points:
+            raw = self.range(field, start, end, columns=("ts",) + METRICS)
+            return "raw", {k: np.asarray(v) for k, v in raw.items()}
+        for level in ROLLUPS:
+            data = self.rollup(field, level, start, end)
+            if len(data["ts"]) <= max_points:
+                break
+        return level, {"ts": data["ts"], **{m: data[f"{m}_mean"] for m in METRICS}}
+
+
+def seed_demo(store, field="Demo Field", days=30, now=None):
+    # One reading per day, like the original History Tracker mock; irrigated when soil < 35%
+    now = int(now if now is not None else time.time())
+    ts = now - np.arange(days)[::-1] * 86400
+    soil = np.random.uniform(20, 80, days)
+    store.append(field, ts, soil, np.random.uniform(25, 40, days), np.random.uniform(40, 90, days), soil < 35)
+    return field
+
+
+def append_frame(store, field, df):
+    # CSV/DataFrame ingestion: timestamp, soil, temp, humidity[, irrigated] (case-insensitive)
+    import pandas as pd
+
+    cols = {str(c).lower(): c for c in df.columns}
+    df = df.sort_values(cols["timestamp"], kind="stable")
+    ts = pd.to_datetime(df[cols["timestamp"]], utc=True).astype("int64") // 10**9
+    irrigated = df[cols["irrigated"]].astype(bool) if "irrigated" in cols else None
+    return store.append(field, ts.to_numpy(), df[cols["soil"]], df[cols["temp"]], df[cols["humidity"]], irrigated)
+
+
+if __name__ == "__main__":
+    import argparse
+    import pandas as pd
+
+    parser = argparse.ArgumentParser(description="Append sensor readings to the history store")
+    parser.add_argument("field")
+    parser.add_argument("csv")
+    parser.add_argument("--root", default=os.environ.get("ECOVERSE_HISTORY_DIR", "history"))
+    args = parser.parse_args()
+    store = SensorHistoryStore(args.root)
+    rows = sum(append_frame(store, args.field, chunk) for chunk in pd.read_csv(args.csv, chunksize=500_000))
+    print(f"appended {rows} readings to {args.field}")
@@ -0,0 +1,286 @@
+"""Columnar ingestion for batch files: CSV, Excel, Parquet and Arrow IPC.
+
+The soil/temp/humidity/crop columns are resolved once from the header
+(case-insensitive), and only those columns plus the pass-through `keep` list
+(KEEP_COLUMNS: field and timestamp, so scored rows can be traced back) are read.
+Features get pinned dtypes (float32 sensors, categorical crop); pass-through
+columns are read as strings from CSV, so no per-chunk type inference runs, and
+in their stored type from the typed formats. keep="*" reads every column.
+CSV, Excel, Parquet and Arrow are all read in bounded-size chunks. `profile` reports rows/sec and peak memory per format,
+so field offices can be told which export to send.
+
+    python ingest.py profile sample.csv
+"""
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+NEEDED = ("soil", "temp", "humidity", "crop", "state")
+KEEP_COLUMNS = ("field", "timestamp")
+FLOAT_COLUMNS = ("soil", "temp", "humidity")
+CHUNK_ROWS = 50_000
+EXTENSIONS = {
+    ".csv": "csv", ".txt": "csv",
+    ".xlsx": "excel", ".xlsm": "excel",
+    ".parquet": "parquet", ".pq": "parquet",
+    ".arrow": "arrow", ".feather": "arrow", ".ipc": "arrow", ".arrows": "arrow",
+}
+
+
+def detect_format(name, default="csv"):
+    return EXTENSIONS.get(os.path.splitext(str(name))[1].lower(), default)
+
+
+def resolve_columns(header):
+    # {needed key: column name in the file}; last duplicate wins, like the old per-row dicts
+    found = {}
+    for col in header:
+        key = str(col).strip().lower()
+        if key in NEEDED:
+            found[key] = col
+    return found
+
+
+def pin_dtypes(df, cols):
+    # Crop names are a handful of distinct strings: a categorical stores them once
+    for key, name in cols.items():
+        df[name] = df[name].astype("float32" if key in FLOAT_COLUMNS else "category")
+    return df
+
+
+def _seekable(source):
+    return not hasattr(source, "read") or (hasattr(source, "seekable") and source.seekable())
+
+
+def _rewind(source):
+    if hasattr(source, "seek"):
+        source.seek(0)
+
+
+class _Prepend(io.RawIOBase):
+    # Puts already-consumed bytes back in front of a non-seekable stream (stdin)
+    def __init__(self, head, stream):
+        self.head, self.stream = head, stream
+
+    def readable(self):
+        return True
+
+    def readinto(self, buf):
+        if self.head:
+            n = min(len(buf), len(self.head))
+            buf[:n], self.head = self.head[:n], self.head[n:]
+            return n
+        data = self.stream.read(len(buf))
+        buf[:len(data)] = data
+        return len(data)
+
+
+def _read_columns(header, keep=KEEP_COLUMNS):
+    # Needed columns plus the pass-through ones, in file order. When none is present, still read
+    # one column so the row count is known.
+    cols = resolve_columns(header)
+    needed = set(cols.values())
+    wanted = None if keep == "*" else {str(k).strip().lower() for k in keep}
+    usecols = [c for c in header if c in needed or wanted is None or str(c).strip().lower() in wanted]
+    return cols, usecols or list(header[:1])
+
+
+def _csv_dtypes(usecols, cols):
+    # Pass-through columns stay strings: no inference, and IDs like "007" keep their zeros
+    dtypes = {name: str for name in usecols}
+    dtypes.update({name: ("float32" if key in FLOAT_COLUMNS else "category") for key, name in cols.items()})
+    return dtypes
+
+
+# ==========================================
+# READERS (all yield DataFrames of at most chunk_rows rows)
+# ==========================================
+def _iter_csv(source, chunk_rows, keep):
+    import pandas as pd
+
+    if _seekable(source):
+        header = list(pd.read_csv(source, nrows=0).columns)
+        _rewind(source)
+    else:
+        line = source.readline()
+        header = list(pd.read_csv(io.BytesIO(line), nrows=0).columns)
+        source = io.BufferedReader(_Prepend(line, source))
+    cols, usecols = _read_columns(header, keep)
+    yield from pd.read_csv(source, usecols=usecols, dtype=_csv_dtypes(usecols, cols), chunksize=chunk_rows)
+
+
+def _iter_parquet(source, chunk_rows, keep):
+    import pyarrow.parquet as pq
+
+    pf = pq.ParquetFile(source)
+    cols, usecols = _read_columns(pf.schema_arrow.names, keep)
+    for batch in pf.iter_batches(batch_size=chunk_rows, columns=usecols):
+        yield pin_dtypes(batch.to_pandas(), cols)
+
+
+def _iter_arrow(source, chunk_rows, keep):
+    import pyarrow as pa
+
+    if isinstance(source, (str, os.PathLike)):
+        source = pa.memory_map(str(source), "r")  # zero-copy reads of the selected columns
+    try:
+        reader = pa.ipc.open_file(source)
+        batches = (reader.get_batch(i) for i in range(reader.num_record_batches))
+        names = reader.schema.names
+    except pa.ArrowInvalid:
+        _rewind(source)
+        reader = pa.ipc.open_stream(source)
+        batches, names = reader, reader.schema.names
+    cols, usecols = _read_columns(names, keep)
+    for batch in batches:
+        batch = batch.select(usecols)
+        for start in range(0, batch.num_rows, chunk_rows):
+            yield pin_dtypes(batch.slice(start, chunk_rows).to_pandas(), cols)
+
+
+def _iter_excel(source, chunk_rows, keep):
+    # openpyxl read-only mode streams rows instead of building the whole sheet in memory
+    import pandas as pd
+    from openpyxl import load_workbook
+
+    wb = load_workbook(source, read_only=True, data_only=True)
+    try:
+        rows = wb.worksheets[0].iter_rows(values_only=True)
+        header = [c for c in next(rows, ())]
+        cols, usecols = _read_columns(header, keep)
+        idx = [header.index(name) for name in usecols]
+        buf = []
+        for row in rows:
+            if all(v is None for v in row):
+                continue
+            buf.append([row[i] if i < len(row) else None for i in idx])
+            if len(buf) == chunk_rows:
+                yield pin_dtypes(pd.DataFrame(buf, columns=usecols), cols)
+                buf = []
+        if buf or not cols:
+            yield pin_dtypes(pd.DataFrame(buf, columns=usecols), cols)
+    finally:
+        wb.close()
+
+
+READERS = {"csv": _iter_csv, "parquet": _iter_parquet, "arrow": _iter_arrow, "excel": _iter_excel}
+
+
+def parse_keep(text):
+    # --keep-columns value: "field,timestamp", "" for features only, "*" for every column
+    return "*" if text.strip() == "*" else tuple(c.strip() for c in text.split(",") if c.strip())
+
+
+def iter_frames(source, fmt=None, chunk_rows=CHUNK_ROWS, name=None, keep=KEEP_COLUMNS):
+    fmt = fmt or detect_format(name if name is not None else getattr(source, "name", source))
+    if fmt not in READERS:
+        raise ValueError(f"unsupported input format: {fmt}")
+    if fmt in ("parquet", "arrow", "excel") and not _seekable(source):
+        source = io.BytesIO(source.read())  # these formats need a seekable file (e.g. stdin)
+    yield from READERS[fmt](source, chunk_rows, keep)
+
+
+def read_frame(source, fmt=None, name=None, chunk_rows=CHUNK_ROWS, keep=KEEP_COLUMNS):
+    import pandas as pd
+
+    frames = list(iter_frames(source, fmt, chunk_rows, name, keep))
+    if not frames:
+        return pd.DataFrame()
+    return frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+
+
+def read_csv_bytes(data, keep=KEEP_COLUMNS):
+    # A byte range of a CSV, header line included (see parallel.py)
+    return read_frame(io.BytesIO(data), "csv", keep=keep)
+
+
+def read_parquet_row_group(path, index, keep=KEEP_COLUMNS):
+    import pyarrow.parquet as pq
+
+    pf = pq.ParquetFile(path)
+    cols, usecols = _read_columns(pf.schema_arrow.names, keep)
+    return pin_dtypes(pf.read_row_group(index, columns=usecols).to_pandas(), cols)
+
+
+# ==========================================
+# FORMAT PROFILING
+# ==========================================
+def measure(path, fmt=None, keep=KEEP_COLUMNS):
+    # Run in a fresh process (see profile) so peak RSS belongs to this format alone; reads the pruned
+    # columns, like scoring does
+    import resource
+
+    import pandas  # noqa: F401  (import cost is not part of the read)
+    try:
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        pass
+    base = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    t0 = time.perf_counter()
+    rows, columns = 0, 0
+    for df in iter_frames(path, fmt, keep=keep):
+        rows, columns = rows + len(df), len(df.columns)
+    elapsed = time.perf_counter() - t0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {
+        "format": fmt or detect_format(path), "rows": rows, "columns_read": columns, "seconds": round(elapsed, 3),
+        "rows_per_sec": round(rows / max(elapsed, 1e-9)), "file_mb": round(os.path.getsize(path) / 2**20, 2),
+        "peak_rss_mb": round(peak / 1024, 1), "read_rss_mb": round((peak - base) / 1024, 1),
+    }
+
+
+def _measure_in_subprocess(path, fmt, keep):
+    here = os.path.dirname(os.path.abspath(__file__))
+    keep = keep if keep == "*" else ",".join(keep)
+    out = subprocess.run([sys.executable, os.path.join(here, "ingest.py"), "measure", path, "--format", fmt,
+                          "--keep-columns", keep], capture_output=True, text=True, check=True)
+    return json.loads(out.stdout)
+
+
+def profile(sample, formats=("csv", "excel", "parquet", "arrow"), keep=KEEP_COLUMNS):
+    # Every column of the sample is written to each format; the timed read is the pruned one
+    df = read_frame(sample, keep="*")
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for fmt in formats:
+            path = os.path.join(tmp, "sample." + ("xlsx" if fmt == "excel" else fmt))
+            try:
+                if fmt == "csv":
+                    df.to_csv(path, index=False)
+                elif fmt == "excel":
+                    df.to_excel(path, index=False)
+                elif fmt == "parquet":
+                    df.to_parquet(path, index=False)
+                else:
+                    df.to_feather(path)
+                results.append(dict(_measure_in_subprocess(path, fmt, keep), file_columns=len(df.columns)))
+            except (ImportError, subprocess.CalledProcessError) as e:
+                results.append({"format": fmt, "error": str(e).strip().splitlines()[-1] if str(e) else type(e).__name__})
+    return results
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Batch file ingestion tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_prof = sub.add_parser("profile", help="rows/sec and peak memory for each export format")
+    p_prof.add_argument("sample")
+    p_prof.add_argument("--formats", default="csv,excel,parquet,arrow")
+    p_meas = sub.add_parser("measure", help="read one file and report (used by profile)")
+    p_meas.add_argument("path")
+    p_meas.add_argument("--format")
+    for p in (p_prof, p_meas):
+        p.add_argument("--keep-columns", type=parse_keep, default=KEEP_COLUMNS,
+                       help="pass-through columns besides the features (default: field,timestamp; '*' = all)")
+    args = parser.parse_args()
+
+    if args.command == "profile":
+        for row in profile(args.sample, tuple(args.formats.split(",")), args.keep_columns):
+            print(json.dumps(row))
+    else:
+        print(json.dumps(measure(args.path, args.format, args.keep_columns)))
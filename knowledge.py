@@ -0,0 +1,52 @@
+"""Crops, states and seasons shared by the app, the engine and the translations."""
+
+# ==========================================
+# KNOWLEDGE BASE
+# ==========================================
+ALL_CROPS = [
+    "Wheat", "Rice", "Corn", "Soybean", "Onion", "Sugarcane", "Cotton", "Sesame",
+    "Groundnut", "Mustard", "Tea", "Coffee", "Rubber", "Coconut", "Jute", "Potato", 
+    "Tomato", "Banana", "Pulse", "Millet", "Turmeric", "Ginger", "Garlic", "Chilli", 
+    "Pepper", "Saffron", "Apple", "Mango", "Orange", "Grapes"
+]
+
+STATE_CROP_MAP = {
+    "Andhra Pradesh": ["Rice", "Chilli", "Cotton", "Groundnut", "Turmeric"],
+    "Arunachal Pradesh": ["Rice", "Corn", "Millet"],
+    "Assam": ["Tea", "Rice", "Jute", "Banana"],
+    "Bihar": ["Rice", "Wheat", "Corn", "Pulse"],
+    "Chhattisgarh": ["Rice", "Pulse", "Soybean"],
+    "Goa": ["Rice", "Coconut", "Cashew", "Mango"],
+    "Gujarat": ["Cotton", "Groundnut", "Sesame", "Onion"],
+    "Haryana": ["Wheat", "Rice", "Mustard", "Cotton"],
+    "Himachal Pradesh": ["Apple", "Corn", "Wheat"],
+    "Jharkhand": ["Rice", "Corn", "Pulse"],
+    "Karnataka": ["Coffee", "Rice", "Sugarcane", "Coconut"],
+    "Kerala": ["Rubber", "Coconut", "Pepper", "Tea", "Rice", "Banana"],
+    "Madhya Pradesh": ["Soybean", "Wheat", "Pulse", "Garlic"],
+    "Maharashtra": ["Sugarcane", "Cotton", "Soybean", "Onion", "Grapes", "Mango"],
+    "Manipur": ["Rice", "Corn", "Chilli"],
+    "Meghalaya": ["Rice", "Ginger", "Turmeric"],
+    "Mizoram": ["Rice", "Ginger", "Turmeric"],
+    "Nagaland": ["Rice", "Corn", "Millet"],
+    "Odisha": ["Rice", "Pulse", "Jute", "Turmeric"],
+    "Punjab": ["Wheat", "Rice", "Cotton", "Sugarcane"],
+    "Rajasthan": ["Mustard", "Millet", "Wheat", "Corn"],
+    "Sikkim": ["Rice", "Cardamom", "Ginger"],
+    "Tamil Nadu": ["Rice", "Sugarcane", "Groundnut", "Coconut", "Banana", "Turmeric"],
+    "Telangana": ["Rice", "Cotton", "Turmeric"],
+    "Tripura": ["Rice", "Rubber", "Tea"],
+    "Uttar Pradesh": ["Wheat", "Sugarcane", "Rice", "Potato"],
+    "Uttarakhand": ["Rice", "Wheat", "Sugarcane"],
+    "West Bengal": ["Rice", "Jute", "Potato", "Tea"],
+    "Jammu & Kashmir": ["Saffron", "Apple", "Rice"],
+    "Andaman & Nicobar": ["Coconut", "Rice", "Banana"],
+    "Delhi": ["Wheat", "Rice"],
+    "Puducherry": ["Rice", "Coconut"]
+}
+
+SORTED_STATES = sorted(STATE_CROP_MAP)
+
+SEASONS = ["Kharif (Monsoon)", "Rabi (Winter)", "Zaid (Summer)"]
+
+CROP_MAP = {name: i for i, name in enumerate(ALL_CROPS)}
@@ -0,0 +1,236 @@
+"""Seeded, streaming synthetic sensor readings for scale and soak tests.
+
+Fields are spread over the STATE_CROP_MAP states and grow one of their state's
+crops. Every reading interval produces one row per field:
+
+- temperature and humidity follow the season's climate (Kharif / Rabi / Zaid by
+  month) plus a per-state offset, with a diurnal cycle peaking mid-afternoon
+  India time (timestamps themselves are UTC)
+- soil moisture decays at the scheduler's crop-class rate (faster when hot and
+  dry), gains monsoon rain, and is refilled when it drops below the class limit
+  of the training rule; those steps are flagged as irrigated
+- all sensors get Gaussian noise
+
+Readings are generated a block of time steps at a time as (steps, fields) NumPy
+arrays and yielded as DataFrames of at most `chunk_rows` rows, so memory stays
+bounded for any volume. The same arguments and seed give the same output.
+Columns: timestamp, field, state, season, crop, soil, temp, humidity, irrigated,
+which both `engine.py score` and `history_store.append_frame` accept.
+
+    python loadgen.py -o readings.parquet --fields 5000 --days 30 --interval 15
+    python loadgen.py -o readings.csv --rows 10000000 --seed 7
+    python loadgen.py --fields 50 --days 365 --history history/    # straight into the history store
+"""
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from knowledge import STATE_CROP_MAP, SEASONS, CROP_MAP
+from engine import TRAIN_CONFIG
+from scheduler import crop_classes, decline_rates, refill_levels
+
+CHUNK_ROWS = 500_000
+# Season by month (Jan..Dec)
+SEASON_OF_MONTH = np.array([1, 1, 1, 2, 2, 0, 0, 0, 0, 0, 1, 1])
+# Per season: mean temp, diurnal temp amplitude, mean humidity, diurnal humidity amplitude, rain chance per hour
+SEASON_CLIMATE = {
+    "Kharif (Monsoon)": (29.0, 4.0, 80.0, 10.0, 0.015),
+    "Rabi (Winter)": (20.0, 7.0, 55.0, 15.0, 0.005),
+    "Zaid (Summer)": (34.0, 7.0, 40.0, 15.0, 0.01),
+}
+NOISE = {"soil": 1.0, "temp": 0.5, "humidity": 2.0}
+RAIN_POINTS = (3.0, 12.0)  # soil %-points per rain event
+IST_OFFSET = 5 * 3600 + 1800  # timestamps are UTC; the climate follows the local (IST) clock
+
+
+def make_fleet(n_fields, seed=0):
+    # Fields spread evenly over the states; each grows a crop its state lists (model crops only)
+    rng = np.random.default_rng([seed, 0])
+    states = list(STATE_CROP_MAP)
+    crops_by_state = [[CROP_MAP[c] for c in STATE_CROP_MAP[s] if c in CROP_MAP] for s in states]
+    state_idx = rng.permutation(np.arange(n_fields) % len(states))
+    crop_ids = np.array([crops_by_state[s][rng.integers(len(crops_by_state[s]))] for s in state_idx.tolist()])
+    limits = np.array([TRAIN_CONFIG['soil_limits'][k] for k in ('other', 'high', 'low')])[crop_classes(crop_ids)]
+    return {
+        "names": np.array([f"F{i:06d}" for i in range(n_fields)]),
+        "state": state_idx, "state_names": states, "crop": crop_ids,
+        "temp_offset": rng.normal(0, 2.0, len(states))[state_idx],
+        "humid_offset": rng.normal(0, 8.0, len(states))[state_idx],
+        "limit": limits.astype(np.float64),
+        "refill": refill_levels(crop_ids, limits.astype(np.float64)),
+        "soil": rng.uniform(40, 85, n_fields),
+    }
+
+
+def _climate(ts, fleet):
+    # (steps,) timestamps -> (steps, fields) temp/humidity means, diurnal cycle included
+    local = ts + IST_OFFSET
+    month = local.astype("datetime64[s]").astype("datetime64[M]").astype(np.int64) % 12
+    hour = (local % 86400) / 3600.0
+    season = SEASON_OF_MONTH[month]
+    table = np.array([SEASON_CLIMATE[s] for s in SEASONS])[season]  # (steps, 5)
+    cycle = np.sin(2 * np.pi * (hour - 9) / 24)[:, None]          # peaks at 15:00 IST (09:30 UTC)
+    temp = table[:, [0]] + fleet["temp_offset"] + table[:, [1]] * cycle
+    humid = table[:, [2]] + fleet["humid_offset"] - table[:, [3]] * cycle
+    return season, temp, np.clip(humid, 5, 100), table[:, 4]
+
+
+def _soil_block(soil0, loss, fleet):
+    # Soil path for a block: start - cumulative loss, with a refill at the first step below the limit.
+    # Each pass resolves one refill per field; a block rarely needs more than one or two.
+    steps, n = loss.shape
+    cum = np.cumsum(loss, axis=0)
+    soil = soil0 - cum
+    irrigated = np.zeros((steps, n), dtype=bool)
+    rows = np.arange(steps)[:, None]
+    last = np.full(n, -1)
+    while True:
+        below = (soil < fleet["limit"]) & (rows > last)
+        hit = below.any(axis=0)
+        if not hit.any():
+            break
+        first = np.where(hit, below.argmax(axis=0), steps)
+        cols = np.flatnonzero(hit)
+        irrigated[first[cols], cols] = True
+        base = cum[np.minimum(first, steps - 1), np.arange(n)]
+        soil = np.where(rows >= first, fleet["refill"] - (cum - base), soil)
+        last = np.where(hit, first, last)
+    return soil, irrigated
+
+
+def generate(n_fields=1000, start="2024-06-01", steps=96, interval_minutes=15, seed=0,
+             chunk_rows=CHUNK_ROWS, max_rows=None, fleet=None):
+    import pandas as pd
+
+    fleet = fleet or make_fleet(n_fields, seed)
+    n = len(fleet["crop"])
+    step_s = int(interval_minutes * 60)
+    t0 = int(np.datetime64(start, "s").astype(np.int64))
+    block = max(1, chunk_rows // n)
+    soil = fleet["soil"].copy()
+    emitted = 0
+    season_cat = pd.CategoricalDtype(SEASONS)
+    crop_names = np.array(list(CROP_MAP))
+    for b, first_step in enumerate(range(0, steps, block)):
+        k = min(block, steps - first_step)
+        rng = np.random.default_rng([seed, 1, b])
+        ts = t0 + (first_step + np.arange(k, dtype=np.int64)) * step_s
+        season, temp, humid, rain_p = _climate(ts, fleet)
+
+        loss = decline_rates(temp, humid, fleet["crop"]) * (step_s / 86400)
+        rain = rng.random((k, n)) < (rain_p * step_s / 3600)[:, None]
+        loss = loss - rain * rng.uniform(*RAIN_POINTS, (k, n))
+        path, irrigated = _soil_block(soil, loss, fleet)
+        path = np.clip(path, 0, 100)
+        soil = path[-1].copy()
+
+        rows = k * n
+        frame = pd.DataFrame({
+            "timestamp": np.repeat(ts, n).astype("datetime64[s]"),
+            "field": pd.Categorical.from_codes(np.tile(np.arange(n), k), categories=fleet["names"]),
+            "state": pd.Categorical.from_codes(np.tile(fleet["state"], k), categories=fleet["state_names"]),
+            "season": pd.Categorical.from_codes(np.repeat(season, n), dtype=season_cat),
+            "crop": pd.Categorical.from_codes(np.tile(fleet["crop"], k), categories=crop_names),
+            "soil": np.clip(path + rng.normal(0, NOISE["soil"], (k, n)), 0, 100).ravel().round(1).astype(np.float32),
+            "temp": (temp + rng.normal(0, NOISE["temp"], (k, n))).ravel().round(1).astype(np.float32),
+            "humidity": np.clip(humid + rng.normal(0, NOISE["humidity"], (k, n)), 0, 100).ravel().round(1).astype(np.float32),
+            "irrigated": irrigated.ravel(),
+        })
+        for lo in range(0, rows, chunk_rows):
+            chunk = frame.iloc[lo:lo + chunk_rows]
+            if max_rows is not None:
+                chunk = chunk.iloc[:max_rows - emitted]
+            if len(chunk):
+                emitted += len(chunk)
+                yield chunk.reset_index(drop=True)
+            if max_rows is not None and emitted >= max_rows:
+                return
+
+
+# ==========================================
+# OUTPUT
+# ==========================================
+def write_csv(frames, out):
+    rows = 0
+    for i, df in enumerate(frames):
+        df.to_csv(out, header=(i == 0), index=False)
+        rows += len(df)
+    return rows
+
+
+def write_parquet(frames, path):
+    # One row group per chunk; the writer is opened on the first chunk's schema
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    writer, rows = None, 0
+    try:
+        for df in frames:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema)
+            writer.write_table(table)
+            rows += len(df)
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows
+
+
+def write_history(frames, root):
+    # Appends each chunk field by field; rows within a field are already in time order
+    from history_store import SensorHistoryStore
+
+    store = SensorHistoryStore(root)
+    rows = 0
+    for df in frames:
+        ts = df["timestamp"].to_numpy().astype("datetime64[s]").astype(np.int64)
+        codes = df["field"].cat.codes.to_numpy()
+        order = np.argsort(codes, kind="stable")
+        bounds = np.flatnonzero(np.r_[True, np.diff(codes[order]) != 0, True])
+        for a, b in zip(bounds[:-1], bounds[1:]):
+            idx = order[a:b]
+            store.append(df["field"].cat.categories[codes[idx[0]]], ts[idx], df["soil"].to_numpy()[idx],
+                         df["temp"].to_numpy()[idx], df["humidity"].to_numpy()[idx], df["irrigated"].to_numpy()[idx])
+        rows += len(df)
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stream synthetic sensor readings")
+    parser.add_argument("-o", "--output", help="CSV or Parquet file ('-' = CSV on stdout)")
+    parser.add_argument("--history", metavar="DIR", help="append into a sensor history store instead")
+    parser.add_argument("--fields", type=int, default=1000)
+    parser.add_argument("--start", default="2024-06-01")
+    parser.add_argument("--days", type=float, default=1.0)
+    parser.add_argument("--interval", type=float, default=15.0, help="minutes between readings")
+    parser.add_argument("--rows", type=int, help="stop after this many rows (extends --days as needed)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    args = parser.parse_args(argv)
+    if not args.output and not args.history:
+        parser.error("give -o FILE or --history DIR")
+
+    steps = int(round(args.days * 1440 / args.interval))
+    if args.rows:
+        steps = max(steps, -(-args.rows // args.fields))
+    frames = generate(args.fields, args.start, steps, args.interval, args.seed, args.chunk_rows, args.rows)
+    t0 = time.perf_counter()
+    if args.history:
+        rows = write_history(frames, args.history)
+    elif args.output == "-":
+        rows = write_csv(frames, sys.stdout)
+    elif args.output.endswith((".parquet", ".pq")):
+        rows = write_parquet(frames, args.output)
+    else:
+        with open(args.output, "w", newline="") as out:
+            rows = write_csv(frames, out)
+    elapsed = time.perf_counter() - t0
+    print(f"wrote {rows:,} rows in {elapsed:.1f}s ({rows / max(elapsed, 1e-9):,.0f} rows/s)", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,200 @@
+"""Stage timers and prediction counters, exported in Prometheus text format.
+
+Timings for model_load, upload_parse, feature_mapping, prediction,
+render_dataframe and render_chart go into fixed-bucket histograms
+(`ecoverse_stage_seconds{stage=...}`), and predictions into
+`ecoverse_predictions_total{crop, state, result}`.
+Recording a sample costs a perf_counter call, a bisect and a dict update under
+a lock (a few microseconds), so the instrumentation stays on in production.
+
+Export by setting either variable before starting the app:
+
+    ECOVERSE_METRICS_PORT=9108              # serves GET /metrics
+    ECOVERSE_METRICS_FILE=/var/lib/node_exporter/ecoverse.prom   # rewritten every ECOVERSE_METRICS_INTERVAL s
+
+ECOVERSE_METRICS_PANEL=1 adds debug panels (these metrics and the scoring queue) to
+the dashboard sidebar.
+"""
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+RESULTS = ("ok", "irrigate")
+
+PORT = os.environ.get("ECOVERSE_METRICS_PORT")
+FILE = os.environ.get("ECOVERSE_METRICS_FILE")
+INTERVAL = float(os.environ.get("ECOVERSE_METRICS_INTERVAL", "15"))
+PANEL = os.environ.get("ECOVERSE_METRICS_PANEL", "").lower() in ("1", "true", "yes")
+
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stages = {}      # stage -> [bucket counts..., +Inf count, sum]
+        self._predictions = {}  # (crop, state, result) -> count
+
+    # ---------- recording ----------
+    def observe(self, stage, seconds):
+        i = bisect_left(BUCKETS, seconds)
+        with self._lock:
+            row = self._stages.get(stage)
+            if row is None:
+                row = self._stages[stage] = [0] * (len(BUCKETS) + 1) + [0.0]
+            row[i] += 1
+            row[-1] += seconds
+
+    @contextmanager
+    def stage(self, name):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - t0)
+
+    def count_prediction(self, crop, state, pred, n=1):
+        key = (crop, state, RESULTS[int(pred)])
+        with self._lock:
+            self._predictions[key] = self._predictions.get(key, 0) + n
+
+    def count_predictions(self, crop_ids, preds, crop_names, state_codes=None, state_names=("unknown",)):
+        # Vectorized: one bincount over (state, crop, result) instead of a dict update per row
+        import numpy as np
+
+        crop_ids = np.asarray(crop_ids, dtype=np.int64)
+        states = np.zeros(len(crop_ids), np.int64) if state_codes is None else np.asarray(state_codes, np.int64)
+        keys = (states * len(crop_names) + crop_ids) * 2 + np.asarray(preds, dtype=np.int64)
+        counts = np.bincount(keys, minlength=0)
+        with self._lock:
+            for key in np.flatnonzero(counts).tolist():
+                cell, result = divmod(key, 2)
+                state, crop = divmod(cell, len(crop_names))
+                label = (crop_names[crop], state_names[state], RESULTS[result])
+                self._predictions[label] = self._predictions.get(label, 0) + int(counts[key])
+
+    # ---------- reading ----------
+    def snapshot(self):
+        with self._lock:
+            return {"stages": {k: list(v) for k, v in self._stages.items()}, "predictions": dict(self._predictions)}
+
+    def take(self):
+        # Snapshot and reset; used by process-pool workers to hand their samples to the parent
+        with self._lock:
+            out = {"stages": self._stages, "predictions": self._predictions}
+            self._stages, self._predictions = {}, {}
+        return out
+
+    def merge(self, snap):
+        with self._lock:
+            for stage, row in snap["stages"].items():
+                mine = self._stages.setdefault(stage, [0] * (len(BUCKETS) + 1) + [0.0])
+                for i, v in enumerate(row):
+                    mine[i] += v
+            for key, n in snap["predictions"].items():
+                self._predictions[key] = self._predictions.get(key, 0) + n
+
+    def stage_summary(self):
+        # {stage: {count, mean_ms, p50_ms, p99_ms}}, percentiles taken from the bucket upper bounds
+        out = {}
+        for stage, row in sorted(self.snapshot()["stages"].items()):
+            counts, total = row[:-1], sum(row[:-1])
+            if not total:
+                continue
+            entry = {"count": total, "mean_ms": round(row[-1] / total * 1e3, 3)}
+            for q in (0.5, 0.99):
+                seen = 0
+                for i, c in enumerate(counts):
+                    seen += c
+                    if seen >= q * total:
+                        entry[f"p{int(q * 100)}_ms"] = BUCKETS[i] * 1e3 if i < len(BUCKETS) else float("inf")
+                        break
+            out[stage] = entry
+        return out
+
+    def render(self):
+        # Prometheus text exposition format 0.0.4
+        snap = self.snapshot()
+        lines = ["# HELP ecoverse_stage_seconds Time spent per pipeline stage.",
+                 "# TYPE ecoverse_stage_seconds histogram"]
+        for stage, row in sorted(snap["stages"].items()):
+            cumulative = 0
+            for bound, count in zip(BUCKETS + ("+Inf",), row[:-1]):
+                cumulative += count
+                lines.append(f'ecoverse_stage_seconds_bucket{{stage="{_escape(stage)}",le="{bound}"}} {cumulative}')
+            lines.append(f'ecoverse_stage_seconds_sum{{stage="{_escape(stage)}"}} {row[-1]:.6f}')
+            lines.append(f'ecoverse_stage_seconds_count{{stage="{_escape(stage)}"}} {cumulative}')
+        lines += ["# HELP ecoverse_predictions_total Irrigation predictions by crop, state and result.",
+                  "# TYPE ecoverse_predictions_total counter"]
+        for (crop, state, result), n in sorted(snap["predictions"].items()):
+            lines.append(f'ecoverse_predictions_total{{crop="{_escape(crop)}",state="{_escape(state)}",'
+                         f'result="{result}"}} {n}')
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+REGISTRY = Registry()
+stage = REGISTRY.stage
+observe = REGISTRY.observe
+count_prediction = REGISTRY.count_prediction
+count_predictions = REGISTRY.count_predictions
+render = REGISTRY.render
+
+
+# ==========================================
+# EXPORT
+# ==========================================
+def write_textfile(path, registry=REGISTRY):
+    # Written beside the target and renamed, so a scraper never reads half a file
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        f.write(registry.render())
+    os.replace(tmp, path)
+
+
+def serve(port, addr="", registry=REGISTRY):
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] not in ("/", "/metrics"):
+                self.send_error(404)
+                return
+            body = registry.render().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((addr, int(port)), Handler)
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
+
+
+def _write_loop(path, interval, registry):
+    while True:
+        try:
+            write_textfile(path, registry)
+        except OSError:
+            pass  # a missing/readonly directory must not take the app down
+        time.sleep(interval)
+
+
+def start_exporters(port=PORT, path=FILE, interval=INTERVAL, registry=REGISTRY):
+    # Call once per process (the app wraps this in st.cache_resource)
+    started = {}
+    if port:
+        started["http"] = serve(port, registry=registry)
+    if path:
+        thread = threading.Thread(target=_write_loop, args=(path, interval, registry), name="metrics-file", daemon=True)
+        thread.start()
+        started["file"] = thread
+    return started
@@ -0,0 +1,196 @@
+"""Process-pool batch scoring for many files and very large files.
+
+Work is split into parts: one per file, or byte ranges of big CSVs and row groups
+of Parquet files. Workers load the model artifact themselves by path, so the
+forest is never pickled to them. The default sklearn backend gives each worker a
+private copy of the trees (a few MB) and has roughly twice the batch throughput
+of the compiled backend, whose memory-mapped node arrays are shared by every
+worker through the page cache but evaluated by a slower NumPy tree walk. Parts
+of a file are stitched back in order, and a file that fails is reported on its
+own without stopping the others.
+
+    python parallel.py district_*.csv state.xlsx -o scored/ -j 8
+"""
+import argparse
+import multiprocessing as mp
+import os
+import shutil
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import engine
+import ingest
+import metrics
+
+SPLIT_BYTES = 64 * 1024 * 1024
+
+_MODEL = None
+
+
+def _init_worker(backend):
+    # Resolves the same active model version as the parent (workers inherit ECOVERSE_MODEL_DIR)
+    global _MODEL
+    _MODEL = engine.get_compiled_model() if backend == "compiled" else engine.get_trained_model()
+
+
+def plan_parts(path, split_bytes=SPLIT_BYTES):
+    # CSVs are cut at line boundaries, Parquet at row groups; everything else is one part
+    fmt = ingest.detect_format(path)
+    if fmt == "parquet":
+        try:
+            import pyarrow.parquet as pq
+            return [("row_group", i) for i in range(pq.ParquetFile(path).num_row_groups)] or [("whole", None)]
+        except ImportError:
+            return [("whole", None)]
+    if fmt != "csv" or os.path.getsize(path) <= split_bytes:
+        return [("whole", None)]
+
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        f.readline()
+        bounds = [f.tell()]
+        while bounds[-1] < size:
+            f.seek(min(bounds[-1] + split_bytes, size))
+            f.readline()
+            bounds.append(min(f.tell(), size))
+    return [("bytes", (a, b)) for a, b in zip(bounds, bounds[1:]) if b > a]
+
+
+def _read_part(path, kind, arg, keep):
+    if kind == "bytes":
+        start, end = arg
+        with open(path, "rb") as f:
+            header = f.readline()
+            f.seek(start)
+            body = f.read(end - start)
+        return ingest.read_csv_bytes(header + body, keep)
+    if kind == "row_group":
+        return ingest.read_parquet_row_group(path, arg, keep)
+    return ingest.read_frame(path, keep=keep)
+
+
+def _score_part(path, part_no, kind, arg, part_path, lang, keep):
+    with metrics.stage("upload_parse"):
+        df = _read_part(path, kind, arg, keep)
+    preds = engine.score_batch(df, _MODEL)
+    df["needs_irrigation"] = preds
+    df["AI Status"] = engine.status_labels(preds, lang)
+    # Only the first part carries the header so parts can be concatenated byte-for-byte
+    df.to_csv(part_path, header=(part_no == 0), index=False)
+    # Timings and prediction counts go back with the result; the worker's registry is reset
+    return len(df), metrics.REGISTRY.take()
+
+
+def _output_path(out_dir, path, index):
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(out_dir, f"{index:03d}-{stem}.scored.csv")
+
+
+def score_files_parallel(paths, out_dir, workers=None, backend="sklearn", lang="English",
+                         split_bytes=SPLIT_BYTES, progress=None, keep=ingest.KEEP_COLUMNS):
+    workers = workers or os.cpu_count() or 1
+    os.makedirs(out_dir, exist_ok=True)
+    parts_dir = os.path.join(out_dir, ".parts")
+    os.makedirs(parts_dir, exist_ok=True)
+
+    # Build/compile the artifact once here, so workers only ever load it
+    if backend == "compiled":
+        engine.get_compiled_model()
+    else:
+        engine.get_trained_model()
+
+    results = [{"path": p, "output": None, "rows": 0, "parts": 0, "seconds": 0.0, "error": None} for p in paths]
+    plans = []
+    for i, path in enumerate(paths):
+        try:
+            plans.append(plan_parts(path, split_bytes))
+        except Exception as e:
+            results[i]["error"] = f"{type(e).__name__}: {e}"
+            plans.append([])
+        results[i]["parts"] = len(plans[-1])
+
+    started = time.perf_counter()
+    done = [0] * len(paths)
+    total_parts, parts_done = sum(len(plan) for plan in plans), 0
+    ctx = mp.get_context("spawn")  # never fork a (possibly threaded) Streamlit server
+    with ProcessPoolExecutor(workers, mp_context=ctx, initializer=_init_worker,
+                             initargs=(backend,)) as pool:
+        futures = {}
+        for i, (path, plan) in enumerate(zip(paths, plans)):
+            for part_no, (kind, arg) in enumerate(plan):
+                part_path = os.path.join(parts_dir, f"{i:03d}-{part_no:05d}.csv")
+                fut = pool.submit(_score_part, path, part_no, kind, arg, part_path, lang, keep)
+                futures[fut] = (i, part_no)
+
+        for fut in as_completed(futures):
+            i, part_no = futures[fut]
+            res = results[i]
+            try:
+                rows, samples = fut.result()
+                res["rows"] += rows
+                metrics.REGISTRY.merge(samples)
+            except Exception as e:
+                if res["error"] is None:
+                    res["error"] = f"{type(e).__name__}: {e}"
+            done[i] += 1
+            parts_done += 1
+            if done[i] == res["parts"]:
+                res["seconds"] = round(time.perf_counter() - started, 3)
+                if res["error"] is None:
+                    res["output"] = _output_path(out_dir, paths[i], i)
+                    _concat_parts(parts_dir, i, res["parts"], res["output"])
+                _drop_parts(parts_dir, i, res["parts"])
+            if progress:
+                progress(res, done[i], parts_done / total_parts)
+
+    shutil.rmtree(parts_dir, ignore_errors=True)
+    return results
+
+
+def _concat_parts(parts_dir, index, n_parts, output):
+    with open(output, "wb") as out:
+        for part_no in range(n_parts):
+            with open(os.path.join(parts_dir, f"{index:03d}-{part_no:05d}.csv"), "rb") as part:
+                shutil.copyfileobj(part, out)
+
+
+def _drop_parts(parts_dir, index, n_parts):
+    for part_no in range(n_parts):
+        try:
+            os.remove(os.path.join(parts_dir, f"{index:03d}-{part_no:05d}.csv"))
+        except FileNotFoundError:
+            pass
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score many sensor files in parallel")
+    parser.add_argument("inputs", nargs="+")
+    parser.add_argument("-o", "--out-dir", required=True)
+    parser.add_argument("-j", "--workers", type=int, default=None)
+    parser.add_argument("--backend", choices=["compiled", "sklearn"], default="sklearn",
+                        help="sklearn: fastest batches; compiled: one shared copy of the model per host")
+    parser.add_argument("--lang", default="English")
+    parser.add_argument("--split-mb", type=int, default=SPLIT_BYTES // (1024 * 1024))
+    parser.add_argument("--keep-columns", type=ingest.parse_keep, default=ingest.KEEP_COLUMNS,
+                        help="columns copied to the output besides the features (default: field,timestamp; '*' = all)")
+    args = parser.parse_args(argv)
+
+    def report(res, parts_done, overall):
+        state = "FAILED" if res["error"] else ("done" if parts_done == res["parts"] else "...")
+        print(f"{overall:4.0%} [{parts_done}/{res['parts']}] {res['path']}: {res['rows']} rows {state}", file=sys.stderr)
+
+    t0 = time.perf_counter()
+    results = score_files_parallel(args.inputs, args.out_dir, args.workers, args.backend, args.lang,
+                                   args.split_mb * 1024 * 1024, report, args.keep_columns)
+    total = sum(r["rows"] for r in results)
+    elapsed = time.perf_counter() - t0
+    print(f"scored {total} rows in {elapsed:.1f}s ({total / max(elapsed, 1e-9):,.0f} rows/s)", file=sys.stderr)
+    for r in results:
+        if r["error"]:
+            print(f"  {r['path']}: {r['error']}", file=sys.stderr)
+    return 1 if any(r["error"] for r in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
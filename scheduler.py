@@ -0,0 +1,237 @@
+"""Capacity-constrained irrigation schedule for a fleet of fields.
+
+Each field's irrigation threshold is the model's own decision boundary: the
+lowest soil moisture at which the forest stops saying "irrigate" for that
+field's temperature, humidity and crop. It is found by a vectorized binary
+search over the distinct (temp, humidity, crop) combinations. Soil moisture is
+projected to fall linearly at a rate set by the crop's water class
+(TRAIN_CONFIG high_water / low_water), scaled by heat and dryness, unless
+measured rates are given. Fields are then taken from a heap in order of
+time-to-threshold, day by day, until the daily water budget or a pump group's
+capacity runs out; whatever does not fit stays on the heap for the next day.
+
+    python scheduler.py fields.csv --days 7 --water-m3 2000000 --pump-capacity 40 -o schedule.csv
+    python scheduler.py --demo 50000 --days 7 --water-m3 2000000 --pump-capacity 40 --pumps 500
+"""
+import argparse
+import heapq
+import sys
+import time
+
+import engine
+from knowledge import ALL_CROPS
+
+# Water model (assumed, not fitted): %-points of soil moisture lost per day at 25 °C / 50 % RH,
+# the level each class is refilled to, and the root zone depth that turns %-points into water
+SCHEDULE_CONFIG = {
+    'decline': {'high': 6.0, 'low': 3.0, 'other': 4.5},
+    'temp_coef': 0.04,      # +4 % decline per °C above 25
+    'humid_coef': 0.005,    # -0.5 % decline per %RH above 50
+    'min_decline': 0.5,
+    'refill': {'high': 85.0, 'low': 55.0, 'other': 70.0},
+    'refill_margin': 10.0,  # refill at least this far above the threshold
+    'root_zone_mm': 300.0,  # 1 %-point over 300 mm = 3 mm = 30 m³/ha
+}
+CLASSES = ('other', 'high', 'low')
+
+
+def crop_classes(crop_ids, config=engine.TRAIN_CONFIG):
+    # 0 = other, 1 = high_water, 2 = low_water
+    import numpy as np
+
+    crop_ids = np.asarray(crop_ids, dtype=np.int64)
+    classes = np.zeros(len(crop_ids), dtype=np.int64)
+    classes[np.isin(crop_ids, config['high_water'])] = 1
+    classes[np.isin(crop_ids, config['low_water'])] = 2
+    return classes
+
+
+def decision_thresholds(temp, humid, crop_ids, predict=None, humid_step=1):
+    # Binary search on soil 0..101 per distinct (temp, humid, crop): first soil level the model does not irrigate.
+    # Assumes "irrigate" only below some soil level, which holds for the training rule.
+    import numpy as np
+    import pandas as pd
+
+    if predict is None:
+        # At tens of thousands of rows sklearn's batched predict beats the compiled forest several times over
+        model = engine.get_trained_model()
+        predict = lambda X: model.predict(pd.DataFrame(X, columns=engine.FEATURES))
+    combos = np.column_stack([np.rint(temp), np.rint(np.asarray(humid) / humid_step) * humid_step,
+                              np.asarray(crop_ids)]).astype(np.float64)
+    combos, inverse = np.unique(combos, axis=0, return_inverse=True)
+    lo = np.zeros(len(combos), dtype=np.int64)
+    hi = np.full(len(combos), 101, dtype=np.int64)
+    rows = np.empty((len(combos), 4), dtype=np.float64)
+    rows[:, 1:] = combos
+    while True:
+        open_ = lo < hi
+        if not open_.any():
+            break
+        mid = (lo + hi) // 2
+        rows[:, 0] = mid
+        irrigate = np.zeros(len(combos), dtype=bool)
+        irrigate[open_] = np.asarray(predict(rows[open_])) == 1
+        lo = np.where(open_ & irrigate, mid + 1, lo)
+        hi = np.where(open_ & ~irrigate, mid, hi)
+    return lo[inverse.ravel()].astype(np.float64)
+
+
+def decline_rates(temp, humid, crop_ids, config=SCHEDULE_CONFIG):
+    # %-points per day
+    import numpy as np
+
+    base = np.array([config['decline'][c] for c in CLASSES])[crop_classes(crop_ids)]
+    scale = (1 + config['temp_coef'] * (np.asarray(temp) - 25)) * (1 - config['humid_coef'] * (np.asarray(humid) - 50))
+    return np.maximum(base * scale, config['min_decline'])
+
+
+def refill_levels(crop_ids, thresholds, config=SCHEDULE_CONFIG):
+    import numpy as np
+
+    refill = np.array([config['refill'][c] for c in CLASSES])[crop_classes(crop_ids)]
+    return np.minimum(np.maximum(refill, thresholds + config['refill_margin']), 100.0)
+
+
+def days_to_threshold(soil, thresholds, rates):
+    # <= 0: already below the boundary
+    import numpy as np
+
+    return (np.asarray(soil, dtype=np.float64) - thresholds) / rates
+
+
+def schedule(soil, temp, humid, crop_ids, days=7, water_budget=None, pump_ids=None, pump_capacity=None,
+             area_ha=None, rates=None, thresholds=None, config=SCHEDULE_CONFIG):
+    """Plan irrigations over `days` days.
+
+    water_budget: m³ per day for the whole fleet (None = unlimited).
+    pump_ids / pump_capacity: pump group per field and irrigations per group per day
+    (a scalar capacity applies to every group; None = unlimited).
+    Returns (plan, daily) DataFrames: one row per irrigation, one row per day.
+    """
+    import numpy as np
+    import pandas as pd
+
+    n = len(soil)
+    soil = np.asarray(soil, dtype=np.float64)
+    if thresholds is None:
+        thresholds = decision_thresholds(temp, humid, crop_ids)
+    if rates is None:
+        rates = decline_rates(temp, humid, crop_ids, config)
+    rates = np.maximum(np.asarray(rates, dtype=np.float64), config['min_decline'])
+    refill = refill_levels(crop_ids, thresholds, config)
+    area = np.ones(n) if area_ha is None else np.asarray(area_ha, dtype=np.float64)
+    pumps = np.zeros(n, dtype=np.int64) if pump_ids is None else np.asarray(pump_ids, dtype=np.int64)
+    n_pumps = int(pumps.max()) + 1 if n else 1
+    if pump_capacity is None:
+        capacity = [float('inf')] * n_pumps
+    else:
+        capacity = np.broadcast_to(np.asarray(pump_capacity, dtype=np.float64), (n_pumps,)).tolist()
+    budget = float('inf') if water_budget is None else float(water_budget)
+    m3_per_point = config['root_zone_mm'] / 100 * 10  # m³ per ha per %-point
+
+    # Heap of (due day, field); every field has exactly one entry
+    heap = list(zip(days_to_threshold(soil, thresholds, rates).tolist(), range(n)))
+    heapq.heapify(heap)
+    level, ref = soil.tolist(), [0.0] * n
+    rate_l, thr_l, refill_l = rates.tolist(), thresholds.tolist(), refill.tolist()
+    area_l, pump_l = area.tolist(), pumps.tolist()
+
+    plan = {'day': [], 'field': [], 'due': [], 'soil_before': [], 'threshold': [], 'refill_to': [],
+            'water_m3': [], 'pump': []}
+    daily = []
+    for day in range(days):
+        water_used, pump_used, deferred = 0.0, [0] * n_pumps, []
+        while heap and heap[0][0] < day + 1:
+            due, i = heapq.heappop(heap)
+            before = max(level[i] - rate_l[i] * (day - ref[i]), 0.0)
+            water = (refill_l[i] - before) * m3_per_point * area_l[i]
+            p = pump_l[i]
+            if pump_used[p] >= capacity[p] or water_used + water > budget:
+                deferred.append((due, i))
+                continue
+            water_used += water
+            pump_used[p] += 1
+            for key, value in (('day', day), ('field', i), ('due', due), ('soil_before', before),
+                               ('threshold', thr_l[i]), ('refill_to', refill_l[i]), ('water_m3', water), ('pump', p)):
+                plan[key].append(value)
+            level[i], ref[i] = refill_l[i], float(day)
+            heapq.heappush(heap, (day + (refill_l[i] - thr_l[i]) / rate_l[i], i))
+        for entry in deferred:
+            heapq.heappush(heap, entry)
+        daily.append({'day': day, 'irrigated': sum(pump_used), 'water_m3': round(water_used, 1),
+                      'deferred': len(deferred),
+                      'deferred_below_threshold': sum(1 for due, _ in deferred if due <= day)})
+
+    plan = pd.DataFrame(plan)
+    plan['late_days'] = np.maximum(plan['day'] - plan['due'], 0).round(2)
+    return plan, pd.DataFrame(daily)
+
+
+# ==========================================
+# COMMAND LINE
+# ==========================================
+def demo_fleet(n, seed=0, pumps=1):
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'field': [f"F{i:06d}" for i in range(n)],
+        'soil': rng.uniform(20, 90, n).round(1), 'temp': rng.uniform(15, 45, n).round(1),
+        'humidity': rng.uniform(20, 90, n).round(1), 'crop': np.array(ALL_CROPS)[rng.integers(0, len(ALL_CROPS), n)],
+        'area_ha': rng.uniform(0.5, 5, n).round(2), 'pump': rng.integers(0, pumps, n),
+    })
+
+
+def read_fleet(path):
+    # field, soil, temp, humidity, crop[, area_ha, pump, decline] (case-insensitive)
+    import pandas as pd
+
+    df = pd.read_csv(path)
+    return df.rename(columns={c: str(c).strip().lower() for c in df.columns})
+
+
+def schedule_frame(df, **kwargs):
+    import numpy as np
+
+    crop_ids = np.maximum(engine.crop_codes(df['crop']), 0)
+    pumps = None
+    if 'pump' in df:
+        pumps = df['pump'].astype('category').cat.codes.to_numpy()
+    plan, daily = schedule(df['soil'].to_numpy(), df['temp'].to_numpy(), df['humidity'].to_numpy(), crop_ids,
+                           pump_ids=pumps, area_ha=df['area_ha'].to_numpy() if 'area_ha' in df else None,
+                           rates=df['decline'].to_numpy() if 'decline' in df else None, **kwargs)
+    ids = df['field'].to_numpy() if 'field' in df else np.arange(len(df))
+    plan.insert(1, 'field_id', ids[plan['field'].to_numpy()])
+    if 'pump' in df:
+        plan['pump'] = df['pump'].to_numpy()[plan['field'].to_numpy()]
+    return plan, daily
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Irrigation schedule for many fields under water and pump limits")
+    parser.add_argument("fields", nargs="?", help="CSV: field, soil, temp, humidity, crop[, area_ha, pump, decline]")
+    parser.add_argument("--demo", type=int, metavar="N", help="schedule N synthetic fields instead")
+    parser.add_argument("--pumps", type=int, default=1, help="pump groups in the demo fleet")
+    parser.add_argument("--days", type=int, default=7)
+    parser.add_argument("--water-m3", type=float, help="fleet water budget per day")
+    parser.add_argument("--pump-capacity", type=int, help="irrigations per pump group per day")
+    parser.add_argument("-o", "--output", help="write the plan CSV here")
+    args = parser.parse_args(argv)
+    if not args.fields and not args.demo:
+        parser.error("give a fields CSV or --demo N")
+
+    df = demo_fleet(args.demo, pumps=args.pumps) if args.demo else read_fleet(args.fields)
+    engine.get_trained_model()  # model load is not part of the timing below
+    t0 = time.perf_counter()
+    plan, daily = schedule_frame(df, days=args.days, water_budget=args.water_m3, pump_capacity=args.pump_capacity)
+    elapsed = time.perf_counter() - t0
+    print(daily.to_string(index=False), file=sys.stderr)
+    print(f"{len(plan)} irrigations for {len(df)} fields over {args.days} days in {elapsed:.2f}s", file=sys.stderr)
+    if args.output:
+        plan.to_csv(args.output, index=False)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
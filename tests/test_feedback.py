@@ -0,0 +1,56 @@
+import threading
+
+import numpy as np
+import pytest
+
+from feedback import FeedbackUpdater, ModelRegistry
+
+
+@pytest.fixture(scope="module")
+def model():
+    from sklearn.ensemble import RandomForestClassifier
+
+    rng = np.random.default_rng(0)
+    X = rng.uniform(0, 100, (200, 4))
+    return RandomForestClassifier(n_estimators=3, random_state=0).fit(X, X[:, 0] < 40)
+
+
+def test_concurrent_publishers_get_distinct_versions(tmp_path, model):
+    # Separate registries stand in for replicas sharing one models/versions directory
+    out, barrier = [], threading.Barrier(4)
+
+    def publish():
+        registry = ModelRegistry(str(tmp_path))
+        barrier.wait()
+        out.append(registry.publish(model, {"parent": None, "method": "grow", "n_feedback": 0}))
+
+    threads = [threading.Thread(target=publish) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert sorted(out) == ["v0000", "v0001", "v0002", "v0003"]
+    assert [v["version"] for v in ModelRegistry(str(tmp_path)).versions()] == sorted(out)
+
+
+def test_claimed_directory_is_skipped(tmp_path, model):
+    # A version another publisher has claimed but not finished is neither reused nor listed
+    (tmp_path / "v0000").mkdir()
+    registry = ModelRegistry(str(tmp_path))
+    assert registry.publish(model, {"parent": None, "method": "grow", "n_feedback": 0}) == "v0001"
+    assert [v["version"] for v in registry.versions()] == ["v0001"]
+
+
+def test_pending_count_is_not_lost_across_threads(tmp_path):
+    class NullLog:
+        def append(self, *row):
+            pass
+
+    updater = FeedbackUpdater(log=NullLog(), registry=ModelRegistry(str(tmp_path)), update_every=10**9)
+    threads = [threading.Thread(target=lambda: [updater.submit(40, 30, 50, 0, 1) for _ in range(2000)])
+               for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert updater._pending == 16000
@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+import engine
+from forest import CompiledForest, compile_forest
+
+SMALL_CONFIG = dict(engine.TRAIN_CONFIG, n=2000, params={'n_estimators': 20, 'random_state': 0})
+
+
+@pytest.fixture(scope="module")
+def model():
+    return engine.train_model(SMALL_CONFIG)
+
+
+@pytest.fixture(scope="module")
+def nan_model():
+    # Trained with missing values, so the trees learn where NaN goes at each split
+    from sklearn.ensemble import RandomForestClassifier
+
+    X, y = engine.synthetic_training_data(SMALL_CONFIG)
+    X = X.to_numpy(dtype=np.float64)
+    rng = np.random.default_rng(0)
+    X[rng.random(X.shape) < 0.1] = np.nan
+    return RandomForestClassifier(n_estimators=20, random_state=0).fit(X, y.to_numpy())
+
+
+def _threshold_rows(model, rng, n=2000):
+    # Rows sitting on, and one float32/float64 step either side of, real split thresholds
+    thr = np.concatenate([est.tree_.threshold[est.tree_.children_left != -1] for est in model.estimators_])
+    feat = np.concatenate([est.tree_.feature[est.tree_.children_left != -1] for est in model.estimators_])
+    pick = rng.integers(0, len(thr), n)
+    X = rng.uniform([10, 15, 20, 0], [90, 45, 90, 29], (n, 4))
+    t = thr[pick]
+    X[np.arange(n), feat[pick]] = np.choose(rng.integers(0, 5, n), [
+        t, np.nextafter(t, np.inf), np.nextafter(t, -np.inf),
+        np.nextafter(t.astype(np.float32), np.float32(np.inf)).astype(np.float64),
+        np.nextafter(t.astype(np.float32), np.float32(-np.inf)).astype(np.float64),
+    ])
+    return X
+
+
+def test_predict_matches_sklearn(model):
+    rng = np.random.default_rng(1)
+    compiled = compile_forest(model)
+    X = np.vstack([
+        rng.uniform([0, 0, 0, 0], [100, 60, 100, 29], (5000, 4)),
+        np.rint(rng.uniform([0, 10, 0, 0], [100, 50, 100, 29], (5000, 4))),
+        _threshold_rows(model, rng),
+    ])
+    np.testing.assert_array_equal(compiled.predict(X), model.predict(X))
+    np.testing.assert_array_equal(compiled.predict_proba(X), model.predict_proba(X))
+
+
+def test_nan_routing_matches_sklearn(nan_model):
+    rng = np.random.default_rng(2)
+    compiled = compile_forest(nan_model)
+    X = rng.uniform([0, 0, 0, 0], [100, 60, 100, 29], (5000, 4))
+    X[rng.random(X.shape) < 0.3] = np.nan
+    np.testing.assert_array_equal(compiled.predict_proba(X), nan_model.predict_proba(X))
+    np.testing.assert_array_equal(compiled.predict(X), nan_model.predict(X))
+
+
+def test_saved_copy_is_memory_mapped(model, tmp_path):
+    rng = np.random.default_rng(3)
+    compiled = compile_forest(model)
+    compiled.save(str(tmp_path / "compiled"))
+    loaded = CompiledForest.load(str(tmp_path / "compiled"))
+    assert isinstance(loaded.threshold, np.memmap)
+    X = rng.uniform([0, 0, 0, 0], [100, 60, 100, 29], (1000, 4))
+    np.testing.assert_array_equal(loaded.predict(X), model.predict(X))
+    assert loaded.predict_one(20, 40, 30, 1) == model.predict([[20, 40, 30, 1]])[0]
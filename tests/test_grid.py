@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+
+import engine
+from grid import DecisionGrid, HUMID_RANGE, SOIL_RANGE, TEMP_RANGE, load_or_build_grid
+
+N_CROPS = 3
+
+
+class ParityModel:
+    # Irrigate when the integer features sum to an odd number: every neighbouring cell differs,
+    # so any slip in the flat index or bit order shows up
+    classes = np.array([0, 1])
+
+    def predict(self, X):
+        return (np.asarray(X, dtype=np.int64).sum(axis=1) % 2).astype(np.int64)
+
+
+def _all_points(n_crops):
+    axes = [np.arange(lo, hi + 1) for lo, hi in (SOIL_RANGE, TEMP_RANGE, HUMID_RANGE, (0, n_crops - 1))]
+    return np.stack(np.meshgrid(*axes, indexing="ij"), axis=-1).reshape(-1, 4)
+
+
+def test_every_cell_reads_back():
+    grid = DecisionGrid.from_model(ParityModel(), N_CROPS)
+    X = _all_points(N_CROPS)
+    np.testing.assert_array_equal(grid._bit(grid._index(X)), ParityModel().predict(X))
+    assert np.unique(grid._index(X)).size == len(X)
+    assert grid.lookup(0, 10, 0, 0) == 0 and grid.lookup(1, 10, 0, 0) == 1
+    assert grid.lookup(100, 50, 100, N_CROPS - 1) == ParityModel().predict([[100, 50, 100, N_CROPS - 1]])[0]
+
+
+def test_off_grid_points_fall_back():
+    grid = DecisionGrid.from_model(ParityModel(), N_CROPS)
+
+    class Fallback:
+        def predict(self, X):
+            return np.full(len(X), 7)
+
+    X = np.array([[40, 30, 50, 0], [40.5, 30, 50, 0], [40, 9, 50, 0], [40, 30, 101, 1], [40, 30, 50, N_CROPS]])
+    np.testing.assert_array_equal(grid.predict(X, Fallback()), [ParityModel().predict(X[:1])[0], 7, 7, 7, 7])
+    assert grid.lookup(40.5, 30, 50, 0) is None
+
+
+def test_matches_sklearn_model(tmp_path):
+    model = engine.train_model(dict(engine.TRAIN_CONFIG, n=2000, params={'n_estimators': 10, 'random_state': 0}))
+    path = str(tmp_path / "grid.npy")
+    load_or_build_grid(model, N_CROPS, path)
+    grid = load_or_build_grid(model, N_CROPS, path)  # second call maps the saved file
+    assert isinstance(grid.bits, np.memmap)
+    X = _all_points(N_CROPS).astype(np.float64)
+    np.testing.assert_array_equal(grid.predict(X, model), model.predict(X))
+
+
+def test_rejects_short_bitset():
+    with pytest.raises(ValueError):
+        DecisionGrid(np.zeros(10, dtype=np.uint8), N_CROPS)
+
+
+def test_base_version_is_served_from_the_grid(tmp_path, monkeypatch):
+    # A rollback to the published base version (feedback.py ensure_base) keeps the grid
+    import json
+
+    monkeypatch.setattr(engine, "VERSIONS_DIR", str(tmp_path))
+    monkeypatch.setattr(engine, "USE_DECISION_GRID", True)
+    monkeypatch.setattr(engine, "get_decision_grid", lambda: "grid")
+    engine._is_base_version.cache_clear()
+    for version, method, key in (("v0000", "base", engine.model_key()), ("v0001", "warm_start", engine.model_key()),
+                                 ("v0002", "base", "stale")):
+        (tmp_path / version).mkdir()
+        (tmp_path / version / "meta.json").write_text(json.dumps({"method": method, "base_key": key}))
+    try:
+        assert engine.grid_for_version(None) == "grid"
+        assert engine.grid_for_version("v0000") == "grid"
+        assert engine.grid_for_version("v0001") is None
+        assert engine.grid_for_version("v0002") is None
+        assert engine.grid_for_version("v0009") is None
+    finally:
+        engine._is_base_version.cache_clear()
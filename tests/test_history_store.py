@@ -0,0 +1,94 @@
+import numpy as np
+import pytest
+
+from history_store import SensorHistoryStore
+
+T0 = 1_717_200_000  # 2024-06-01 00:00 UTC
+
+
+def _readings(start, n, step=60, seed=0):
+    rng = np.random.default_rng(seed)
+    ts = T0 + (start + np.arange(n)) * step
+    return ts, rng.uniform(20, 80, n), rng.uniform(25, 40, n), rng.uniform(40, 90, n), rng.random(n) < 0.1
+
+
+def _rollups(store, field):
+    return {level: store.rollup(field, level) for level in ("hour", "day")}
+
+
+def _assert_same(store, reference, field):
+    for name in ("ts", "soil", "temp", "humid", "irrigated"):
+        np.testing.assert_array_equal(store.range(field)[name], reference.range(field)[name])
+    for name in ("ts", "soil"):
+        np.testing.assert_array_equal(store.irrigation_events(field)[name], reference.irrigation_events(field)[name])
+    got, want = _rollups(store, field), _rollups(reference, field)
+    for level in got:
+        for key in want[level]:
+            np.testing.assert_allclose(got[level][key], want[level][key], rtol=1e-6)
+        assert got[level]["n"].sum() == store.count(field)
+
+
+def test_torn_timestamp_write_is_dropped(tmp_path):
+    store, reference = SensorHistoryStore(str(tmp_path / "a")), SensorHistoryStore(str(tmp_path / "b"))
+    for s in (store, reference):
+        s.append("F", *_readings(0, 120))
+    # A crash mid-append: values written, commit record torn after 4 bytes
+    ts, soil, temp, humid, irrigated = _readings(120, 60, seed=1)
+    for name, arr in (("soil", soil), ("temp", temp), ("humid", humid), ("irrigated", irrigated)):
+        with open(store._path("F", f"{name}.bin"), "ab") as f:
+            f.write(arr.astype(np.uint8 if name == "irrigated" else np.float32).tobytes())
+    with open(store._path("F", "ts.bin"), "ab") as f:
+        f.write(ts[:1].tobytes()[:4])
+
+    kind, data = store.series("F")
+    assert kind == "raw" and all(len(v) == 120 for v in data.values())
+    assert store.count("F") == 120
+
+    more = _readings(120, 60, seed=2)
+    store.append("F", *more)
+    reference.append("F", *more)
+    _assert_same(store, reference, "F")
+
+
+def test_rollups_catch_up_after_an_interrupted_append(tmp_path, monkeypatch):
+    store, reference = SensorHistoryStore(str(tmp_path / "a")), SensorHistoryStore(str(tmp_path / "b"))
+    batches = [_readings(0, 90), _readings(90, 60, seed=1), _readings(150, 30, seed=2)]
+    store.append("F", *batches[0])
+
+    # Crash after ts.bin committed, before the rollups were written
+    def crash(*args):
+        raise KeyboardInterrupt
+
+    with monkeypatch.context() as m:
+        m.setattr(store, "_update_rollup", crash)
+        with pytest.raises(KeyboardInterrupt):
+            store.append("F", *batches[1])
+    assert store.count("F") == 150
+
+    store.append("F", *batches[2])
+    for batch in batches:
+        reference.append("F", *batch)
+    _assert_same(store, reference, "F")
+
+
+def test_partial_rollup_write_is_rebuilt(tmp_path, monkeypatch):
+    # Crash between the hourly and daily rollup updates: the hourly tail already holds the new rows
+    store, reference = SensorHistoryStore(str(tmp_path / "a")), SensorHistoryStore(str(tmp_path / "b"))
+    batches = [_readings(0, 90), _readings(90, 60, seed=1), _readings(150, 30, seed=2)]
+    store.append("F", *batches[0])
+    update = store._update_rollup
+
+    def hour_only(field, level, buckets):
+        if level == "day":
+            raise KeyboardInterrupt
+        update(field, level, buckets)
+
+    with monkeypatch.context() as m:
+        m.setattr(store, "_update_rollup", hour_only)
+        with pytest.raises(KeyboardInterrupt):
+            store.append("F", *batches[1])
+
+    store.append("F", *batches[2])
+    for batch in batches:
+        reference.append("F", *batch)
+    _assert_same(store, reference, "F")